@@ -31,6 +31,14 @@ class Settings:
     STREAK_7D_MULTIPLIER: float = 1.5
     STREAK_30D_MULTIPLIER: float = 2.0
     BASE_STREAK_REWARD: int = 10
+    STREAK_JOB_TIME: str = "00:05"  # local time of the nightly break evaluation
+    STREAK_JOB_BATCH: int = 500
+    
+    # Leaderboards (/top)
+    LEADERBOARD_PAGE_SIZE: int = 10
+    
+    # Rendered inline keyboards kept in memory (handlers.keyboards)
+    KEYBOARD_CACHE_SIZE: int = 4096
     
     # Pet system
     MAX_PETS: int = 7
@@ -38,14 +46,62 @@ class Settings:
         "Panda", "Fox", "Dog", "Snake", "Alligator", "Dragon", "Parrot"
     ])
     
+    # Sunflower ledger compaction
+    LEDGER_CHECKPOINT_HORIZON_DAYS: int = 30
+    LEDGER_CHECKPOINT_INTERVAL_SECONDS: int = 86400
+    LEDGER_CHECKPOINT_BATCH_USERS: int = 500
+    
     # Game rewards
     GAME_BASE_REWARD: int = 50
     
+    # Word Chain dictionary (one word per line, optional "<TAB>frequency")
+    WORDLIST_PATH: str = "words.txt"
+    
+    # Hangman word bank (one word per line; indexed and mapped by hangman_words.load() at startup)
+    HANGMAN_WORDS_PATH: str = "hangman_words.txt"
+    HANGMAN_RECENT_WORDS: int = 50
+    
+    # Game sessions (write-behind of in-memory game state)
+    GAME_SESSION_FLUSH_SECONDS: int = 5
+    
+    # Turn timeouts: the player to move forfeits after this long
+    GAME_TURN_TIMEOUT_SECONDS: int = 120
+    GAME_REAPER_TICK_SECONDS: int = 5
+    GAME_REAPER_BATCH: int = 100
+    
+    # Rating rewards (for ratings of 4+ stars)
+    RATING_REWARD_RATER: int = 10
+    RATING_REWARD_RATED: int = 20
+    
+    # Pending ratings expire so users can't get stuck in RATING
+    PENDING_RATING_TTL_HOURS: int = 24
+    PENDING_RATING_SWEEP_SECONDS: int = 600
+    PENDING_RATING_SWEEP_BATCH: int = 500
+    
     # Moderation
     PREMIUM_DAILY_LINK_LIMIT: int = 5
+    FREE_DAILY_LINK_LIMIT: int = 0
+    LINK_COUNTER_FLUSH_SECONDS: int = 60
+    SPAM_FLOOD_MESSAGES: int = 8  # more than this many messages...
+    SPAM_FLOOD_SECONDS: int = 10  # ...within this many seconds is flooding
+    SPAM_REPEAT_LIMIT: int = 3  # identical messages in a row before rejecting
+    SPAM_TRACKED_USERS: int = 50_000
+    BANNED_PHRASES_PATH: str = "banned_phrases.txt"
+    BANNED_PHRASES_RELOAD_SECONDS: int = 30
     MIN_RATINGS_FOR_DISPLAY: int = 5
+    RATING_PRIOR_WEIGHT: int = 10  # Bayesian smoothing: pseudo-votes at the global mean
+    RATING_SCORE_INTERVAL_SECONDS: int = 3600
     VIOLATION_THRESHOLD: int = 3
     AUTO_BAN_HOURS: int = 24
+    VIOLATION_WINDOW_HOURS: int = 24
+    VIOLATION_FLUSH_SECONDS: int = 5
+    VIOLATION_FLUSH_BATCH: int = 100
+    
+    # Message monitoring (daily partitions + archive)
+    MONITOR_RETENTION_DAYS: int = 7
+    MONITOR_ARCHIVE_DIR: str = "archive"
+    MONITOR_ARCHIVE_INTERVAL_SECONDS: int = 3600
+    MONITOR_ARCHIVE_CHUNK_SIZE: int = 1000
     
     # Matchmaking
     MATCH_HISTORY_WINDOW_SECONDS: int = 1800  # 30 minutes
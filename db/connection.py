@@ -7,11 +7,33 @@ print("BOOT: db.connection module loaded")
 
 import aiosqlite
 import asyncio
+from contextlib import asynccontextmanager
 from config import settings
 from pathlib import Path
 
 _db = None
 _db_lock = asyncio.Lock()
+_tx_lock = asyncio.Lock()
+
+
+class _SharedConnection:
+    """
+    Handle to the singleton connection.
+    `async with await get_db() as db` borrows it; leaving the block must not
+    close (or re-start) the shared aiosqlite connection.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
 
 
 async def get_db():
@@ -34,7 +56,39 @@ async def get_db():
             await _db.execute("PRAGMA foreign_keys=ON")
             await _db.execute("PRAGMA busy_timeout = 5000")
 
-        return _db
+        return _SharedConnection(_db)
+
+
+@asynccontextmanager
+async def transaction():
+    """
+    BEGIN IMMEDIATE ... COMMIT on the shared connection.
+    Transactions are serialized with a lock (coroutines share one connection,
+    so SQLite's own locking can't separate them). Rolls back on any error.
+    Every write goes through here: a hand-written BEGIN or commit() on the
+    shared connection would start inside, or commit, another coroutine's
+    transaction. get_db() is for reads only.
+    """
+    async with await get_db() as db:
+        async with _tx_lock:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                await db.execute("ROLLBACK")
+                raise
+            else:
+                await db.commit()
+
+
+async def close_database():
+    """Close the shared connection (shutdown / scripts)"""
+    global _db
+
+    async with _db_lock:
+        if _db is not None:
+            await _db.close()
+            _db = None
 
 
 async def init_database():
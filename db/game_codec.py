@@ -0,0 +1,230 @@
+"""
+Compact binary encoding of active_games.game_state - NO SQL, used by db.games
+
+Layout: one header byte (version << 4 | kind) followed by a per-kind body.
+- tic-tac-toe: 3 bytes, X mask (9 bits) | O mask (9 bits) << 9 | O-to-move << 18
+- hangman:     guessed-letter mask (26 bits), wrong, max_wrong, word (length-prefixed);
+               the word's own letter mask is rebuilt on decode
+- word chain:  difficulty, word count, then per word a header byte:
+               < 0x80: a-z word of that many letters, packed id (5 bits per
+               letter) in ceil(5 * letters / 8) bytes; 0x80: varint utf-8
+               length + bytes for anything else
+decode_state also accepts legacy JSON text so rows written before the codec
+keep loading.
+"""
+import json
+import string
+from typing import Any, Dict, List, Tuple, Union
+
+VERSION = 1
+
+KIND_TICTACTOE = 1
+KIND_HANGMAN = 2
+KIND_WORDCHAIN = 3
+
+_LETTER_CODES = {letter: i + 1 for i, letter in enumerate(string.ascii_lowercase)}
+# Letter -> its 5-bit code as a binary string, so packing is translate + int()
+_TO_BITS = str.maketrans({letter: format(code, '05b') for letter, code in _LETTER_CODES.items()})
+# 10-bit chunk -> the two letters it packs (code 0 = no letter)
+_CODE_LETTERS = [''] + list(string.ascii_lowercase) + [''] * 5
+_PAIRS = [_CODE_LETTERS[i & 0x1F] + _CODE_LETTERS[i >> 5] for i in range(1024)]
+_DIFFICULTIES = ('easy', 'hard')
+
+
+def _kind(game_type: str) -> int:
+    if game_type == 'tictactoe':
+        return KIND_TICTACTOE
+    if game_type == 'hangman':
+        return KIND_HANGMAN
+    if game_type.startswith('wordchain'):
+        return KIND_WORDCHAIN
+    raise ValueError(f"Unknown game type: {game_type}")
+
+
+# ============ VARINTS ============
+
+def _put_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+# ============ WORD IDS ============
+
+def pack_word(word: str) -> int:
+    """a-z word -> integer id, 5 bits per letter (first letter lowest)"""
+    return int(word[::-1].translate(_TO_BITS), 2)
+
+
+def unpack_word(word_id: int) -> str:
+    pairs = []
+    while word_id:
+        pairs.append(_PAIRS[word_id & 0x3FF])
+        word_id >>= 10
+    return ''.join(pairs)
+
+
+def _is_packable(word: str) -> bool:
+    return word.isascii() and word.isalpha() and word.islower()
+
+
+# ============ PER-KIND BODIES ============
+
+def _encode_tictactoe(state: Dict[str, Any], out: bytearray):
+    if 'x' in state:
+        x_mask, o_mask = state['x'], state['o']
+    else:
+        x_mask = o_mask = 0
+        for i, cell in enumerate(state['board']):
+            if cell == 'X':
+                x_mask |= 1 << i
+            elif cell == 'O':
+                o_mask |= 1 << i
+
+    packed = x_mask | (o_mask << 9) | ((state['current_symbol'] == 'O') << 18)
+    out += packed.to_bytes(3, 'little')
+
+
+def _decode_tictactoe(data: bytes, pos: int) -> Dict[str, Any]:
+    packed = int.from_bytes(data[pos:pos + 3], 'little')
+    x_mask = packed & 0x1FF
+    o_mask = (packed >> 9) & 0x1FF
+
+    board = [
+        'X' if x_mask >> i & 1 else 'O' if o_mask >> i & 1 else ''
+        for i in range(9)
+    ]
+    return {
+        'board': board,
+        'current_symbol': 'O' if packed >> 18 & 1 else 'X',
+        'x': x_mask,
+        'o': o_mask
+    }
+
+
+def _encode_hangman(state: Dict[str, Any], out: bytearray):
+    if 'guessed' in state:
+        mask = state['guessed']
+    else:
+        mask = 0
+        for letter in state['guessed_letters']:
+            code = _LETTER_CODES.get(letter)
+            if code:  # non a-z guesses can never match the word
+                mask |= 1 << (code - 1)
+
+    word = state['word'].encode('utf-8')
+    out += mask.to_bytes(4, 'little')
+    out.append(state['wrong_guesses'])
+    out.append(state['max_wrong'])
+    _put_varint(out, len(word))
+    out += word
+
+
+def _decode_hangman(data: bytes, pos: int) -> Dict[str, Any]:
+    mask = int.from_bytes(data[pos:pos + 4], 'little')
+    wrong, max_wrong = data[pos + 4], data[pos + 5]
+    length, pos = _get_varint(data, pos + 6)
+    word = data[pos:pos + length].decode('utf-8')
+
+    word_mask = 0
+    for letter in word:
+        code = _LETTER_CODES.get(letter)
+        if code:
+            word_mask |= 1 << (code - 1)
+
+    return {
+        'word': word,
+        'guessed': mask,
+        'word_mask': word_mask,
+        'wrong_guesses': wrong,
+        'max_wrong': max_wrong
+    }
+
+
+def _encode_wordchain(state: Dict[str, Any], out: bytearray):
+    out.append(_DIFFICULTIES.index(state['difficulty']))
+    _put_varint(out, len(state['words']))
+
+    for word in state['words']:
+        letters = len(word)
+        if letters < 0x80 and _is_packable(word):
+            out.append(letters)
+            out += pack_word(word).to_bytes((5 * letters + 7) // 8, 'little')
+        else:
+            raw = word.encode('utf-8')
+            out.append(0x80)
+            _put_varint(out, len(raw))
+            out += raw
+
+
+def _decode_wordchain(data: bytes, pos: int) -> Dict[str, Any]:
+    difficulty = _DIFFICULTIES[data[pos]]
+    count, pos = _get_varint(data, pos + 1)
+
+    words: List[str] = []
+    for _ in range(count):
+        header = data[pos]
+        if header < 0x80:
+            end = pos + 1 + (5 * header + 7) // 8
+            words.append(unpack_word(int.from_bytes(data[pos + 1:end], 'little')))
+            pos = end
+        else:
+            length, pos = _get_varint(data, pos + 1)
+            words.append(data[pos:pos + length].decode('utf-8'))
+            pos += length
+
+    return {
+        'words': words,
+        'difficulty': difficulty,
+        'used_words': {word.lower() for word in words}
+    }
+
+
+_ENCODERS = {
+    KIND_TICTACTOE: _encode_tictactoe,
+    KIND_HANGMAN: _encode_hangman,
+    KIND_WORDCHAIN: _encode_wordchain,
+}
+
+_DECODERS = {
+    KIND_TICTACTOE: _decode_tictactoe,
+    KIND_HANGMAN: _decode_hangman,
+    KIND_WORDCHAIN: _decode_wordchain,
+}
+
+
+# ============ PUBLIC API ============
+
+def encode_state(game_type: str, state: Dict[str, Any]) -> bytes:
+    kind = _kind(game_type)
+    out = bytearray([(VERSION << 4) | kind])
+    _ENCODERS[kind](state, out)
+    return bytes(out)
+
+
+def decode_state(data: Union[bytes, str]) -> Dict[str, Any]:
+    """Decode a stored game_state (binary, or legacy JSON text)"""
+    if isinstance(data, str):
+        state = json.loads(data)
+        if 'used_words' in state:
+            state['used_words'] = set(state['used_words'])
+        return state
+
+    version, kind = data[0] >> 4, data[0] & 0x0F
+    if version != VERSION or kind not in _DECODERS:
+        raise ValueError(f"Unsupported game_state encoding: version {version}, kind {kind}")
+
+    return _DECODERS[kind](data, 1)
@@ -1,9 +1,177 @@
 """
 Game state management - OWNS active_games table
+Unfinished games live in an in-process session store (game_id -> game dict,
+chat_id -> game_id, player user_id -> game_id). Moves only touch the
+session; dirty states are written behind by flush_game_sessions (periodic
+job + shutdown) and immediately when a game ends. load_active_games
+restores unfinished games at startup.
+Bets are escrowed by create_game; settle_game ends a game and releases
+its escrow in a single transaction, chat ends refund it.
+Each session's turn deadline sits in a timer wheel; pop_timed_out_games
+hands expired ones to the reaper (services.game_reaper).
 """
-import json
-from typing import Optional, Dict, Any
-from db.connection import get_db
+import time
+from typing import Optional, Dict, Any, List, Set, Tuple
+from db.connection import get_db, transaction
+from db.game_codec import encode_state, decode_state
+from db.leaderboards import boards
+from config import settings
+
+
+class TimerWheel:
+    """
+    Single-level hashed timer wheel: key -> deadline, bucketed by
+    tick = deadline // tick_seconds into slots (tick % slot count).
+    schedule/cancel are O(1); expire() only visits the slots whose ticks
+    have passed, so cost is proportional to elapsed ticks + expired keys.
+    """
+
+    def __init__(self, tick_seconds: float, slots: int):
+        self.tick_seconds = tick_seconds
+        self.slots: List[Set[int]] = [set() for _ in range(slots)]
+        self.deadlines: Dict[int, float] = {}
+        self._last_tick = int(time.monotonic() // tick_seconds)
+
+    def _slot(self, deadline: float) -> Set[int]:
+        return self.slots[int(deadline // self.tick_seconds) % len(self.slots)]
+
+    def schedule(self, key: int, deadline: float):
+        self.cancel(key)
+        self.deadlines[key] = deadline
+        self._slot(deadline).add(key)
+
+    def cancel(self, key: int):
+        deadline = self.deadlines.pop(key, None)
+        if deadline is not None:
+            self._slot(deadline).discard(key)
+
+    def expire(self, now: float) -> List[int]:
+        """Remove and return keys whose deadline is <= now"""
+        tick = int(now // self.tick_seconds)
+        ticks = min(tick - self._last_tick + 1, len(self.slots))
+        expired = []
+
+        for t in range(tick - ticks + 1, tick + 1):
+            slot = self.slots[t % len(self.slots)]
+            # Keys a full rotation (or more) ahead stay put
+            due = [key for key in slot if self.deadlines[key] <= now]
+            for key in due:
+                slot.discard(key)
+                del self.deadlines[key]
+            expired.extend(due)
+
+        self._last_tick = tick
+        return expired
+
+    def __len__(self) -> int:
+        return len(self.deadlines)
+
+
+_sessions: Dict[int, Dict[str, Any]] = {}
+_by_chat: Dict[int, int] = {}
+_by_player: Dict[int, int] = {}
+_dirty: Set[int] = set()
+_turn_timers = TimerWheel(settings.GAME_REAPER_TICK_SECONDS, 64)
+
+
+def _start_turn_timer(game_id: int):
+    _turn_timers.schedule(game_id, time.monotonic() + settings.GAME_TURN_TIMEOUT_SECONDS)
+
+
+def _add_session(game: Dict[str, Any]):
+    _sessions[game['game_id']] = game
+    _by_chat[game['chat_id']] = game['game_id']
+    _by_player[game['player1_id']] = game['game_id']
+    _by_player[game['player2_id']] = game['game_id']
+    _start_turn_timer(game['game_id'])
+
+
+def _drop_session(game_id: int):
+    game = _sessions.pop(game_id, None)
+    _dirty.discard(game_id)
+    _turn_timers.cancel(game_id)
+    
+    if not game:
+        return
+    
+    if _by_chat.get(game['chat_id']) == game_id:
+        del _by_chat[game['chat_id']]
+    for player_id in (game['player1_id'], game['player2_id']):
+        if _by_player.get(player_id) == game_id:
+            del _by_player[player_id]
+
+
+async def load_active_games() -> int:
+    """Startup crash recovery: load every unfinished game into the session store"""
+    for game_id in list(_sessions):
+        _drop_session(game_id)
+    
+    async with await get_db() as db:
+        cursor = await db.execute(
+            """
+            SELECT game_id, chat_id, game_type, player1_id, player2_id, bet_amount,
+                   game_state, current_turn
+            FROM active_games
+            WHERE winner_id IS NULL AND ended_at IS NULL
+            ORDER BY game_id
+            """
+        )
+        rows = await cursor.fetchall()
+    
+    for row in rows:
+        _add_session({
+            'game_id': row['game_id'],
+            'chat_id': row['chat_id'],
+            'game_type': row['game_type'],
+            'player1_id': row['player1_id'],
+            'player2_id': row['player2_id'],
+            'bet_amount': row['bet_amount'],
+            'state': decode_state(row['game_state']),
+            'current_turn': row['current_turn'],
+            'winner_id': None,
+            'ended': False
+        })
+    
+    return len(rows)
+
+
+async def flush_game_sessions() -> int:
+    """Write dirty session states in one transaction. Returns games written."""
+    if not _dirty:
+        return 0
+    
+    game_ids: List[int] = []
+    rows = []
+    
+    try:
+        async with transaction() as db:
+            # Snapshot only once the lock is held, so a flush queued behind
+            # settlement writes the latest states; finished games are skipped
+            game_ids = list(_dirty)
+            _dirty.clear()
+            
+            rows = [
+                (
+                    encode_state(_sessions[game_id]['game_type'], _sessions[game_id]['state']),
+                    _sessions[game_id]['current_turn'],
+                    game_id
+                )
+                for game_id in game_ids if game_id in _sessions
+            ]
+            
+            await db.executemany(
+                """
+                UPDATE active_games SET game_state = ?, current_turn = ?
+                WHERE game_id = ? AND ended_at IS NULL
+                """,
+                rows
+            )
+    except Exception:
+        # Keep them dirty for the next flush (unless ended meanwhile)
+        _dirty.update(game_id for game_id in game_ids if game_id in _sessions)
+        raise
+    
+    return len(rows)
 
 
 async def create_game(
@@ -13,96 +181,172 @@ async def create_game(
     player2_id: int,
     bet_amount: int,
     initial_state: Dict[str, Any]
-) -> int:
-    """Create new game, returns game_id"""
-    async with await get_db() as db:
+) -> Optional[int]:
+    """
+    Create new game, returns game_id. Both players' bets move into escrow
+    in the same transaction. None (nothing written) if the chat already has
+    an unfinished game (e.g. a double-clicked Accept) or a player can't
+    cover the bet.
+    """
+    from db.sunflowers import (
+        short_stake_in_transaction, hold_stakes_in_transaction, read_totals_in_transaction
+    )
+    
+    stakes = [(player1_id, bet_amount), (player2_id, bet_amount)]
+    totals = {}
+    
+    async with transaction() as db:
+        cursor = await db.execute(
+            "SELECT 1 FROM active_games WHERE chat_id = ? AND winner_id IS NULL AND ended_at IS NULL",
+            (chat_id,)
+        )
+        if await cursor.fetchone() is not None:
+            return None
+        
+        if bet_amount > 0 and await short_stake_in_transaction(db, stakes) is not None:
+            return None
+        
         cursor = await db.execute(
             """
             INSERT INTO active_games
             (chat_id, game_type, player1_id, player2_id, bet_amount, game_state, current_turn)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
-            (chat_id, game_type, player1_id, player2_id, bet_amount, json.dumps(initial_state), player1_id)
+            (
+                chat_id, game_type, player1_id, player2_id, bet_amount,
+                encode_state(game_type, initial_state), player1_id
+            )
         )
-        await db.commit()
-        return cursor.lastrowid
+        game_id = cursor.lastrowid
+        
+        if bet_amount > 0:
+            await hold_stakes_in_transaction(db, game_id, stakes)
+            totals = await read_totals_in_transaction(db, (player1_id, player2_id))
+    
+    boards['sunflowers'].update_many(totals)
+    _add_session({
+        'game_id': game_id,
+        'chat_id': chat_id,
+        'game_type': game_type,
+        'player1_id': player1_id,
+        'player2_id': player2_id,
+        'bet_amount': bet_amount,
+        'state': initial_state,
+        'current_turn': player1_id,
+        'winner_id': None,
+        'ended': False
+    })
+    return game_id
 
 
 async def get_active_game(chat_id: int) -> Optional[Dict[str, Any]]:
-    """Get active game for chat"""
-    async with await get_db() as db:
-        cursor = await db.execute(
-            """
-            SELECT game_id, game_type, player1_id, player2_id, bet_amount, game_state, current_turn
-            FROM active_games
-            WHERE chat_id = ? AND winner_id IS NULL
-            """,
-            (chat_id,)
-        )
-        row = await cursor.fetchone()
-        
-        if not row:
-            return None
-        
-        return {
-            'game_id': row['game_id'],
-            'game_type': row['game_type'],
-            'player1_id': row['player1_id'],
-            'player2_id': row['player2_id'],
-            'bet_amount': row['bet_amount'],
-            'state': json.loads(row['game_state']),
-            'current_turn': row['current_turn']
-        }
+    """Get active game for chat (session store, no SQL)"""
+    game_id = _by_chat.get(chat_id)
+    return _sessions.get(game_id) if game_id is not None else None
+
+
+def get_player_game(user_id: int) -> Optional[Dict[str, Any]]:
+    """The user's unfinished game, if any (session store, no SQL, not a coroutine)"""
+    game_id = _by_player.get(user_id)
+    return _sessions.get(game_id) if game_id is not None else None
 
 
 async def update_game_state(game_id: int, new_state: Dict[str, Any], current_turn: int):
-    """Update game state and current turn"""
-    async with await get_db() as db:
-        await db.execute(
-            """
-            UPDATE active_games
-            SET game_state = ?, current_turn = ?
-            WHERE game_id = ?
-            """,
-            (json.dumps(new_state), current_turn, game_id)
-        )
-        await db.commit()
+    """Update game state and current turn (persisted by the next flush)"""
+    game = _sessions.get(game_id)
+    
+    if game is None:
+        # Not an active session: write through
+        async with transaction() as db:
+            cursor = await db.execute(
+                "SELECT game_type FROM active_games WHERE game_id = ?",
+                (game_id,)
+            )
+            row = await cursor.fetchone()
+            if not row:
+                return
+            
+            await db.execute(
+                """
+                UPDATE active_games
+                SET game_state = ?, current_turn = ?
+                WHERE game_id = ? AND ended_at IS NULL
+                """,
+                (encode_state(row['game_type'], new_state), current_turn, game_id)
+            )
+        return
+    
+    if current_turn != game['current_turn']:
+        _start_turn_timer(game_id)
+    
+    game['state'] = new_state
+    game['current_turn'] = current_turn
+    _dirty.add(game_id)
 
 
-async def end_game(game_id: int, winner_id: Optional[int]):
-    """Mark game as ended with optional winner"""
-    async with await get_db() as db:
-        await db.execute(
-            """
-            UPDATE active_games
-            SET winner_id = ?, ended_at = CURRENT_TIMESTAMP
-            WHERE game_id = ?
-            """,
-            (winner_id, game_id)
-        )
-        await db.commit()
+def discard_chat_sessions(chat_id: int):
+    """Forget the chat's session after its game was ended in SQL (end_chat_atomic)"""
+    game_id = _by_chat.get(chat_id)
+    if game_id is not None:
+        _drop_session(game_id)
+
+
+async def end_chat_games_in_transaction(db, chat_id: int) -> Dict[int, int]:
+    """
+    End the chat's unfinished games without a winner and refund their
+    escrowed bets (caller owns the transaction, then discard_chat_sessions).
+    Returns the refunded players' sunflower totals for the leaderboard.
+    """
+    from db.sunflowers import release_escrow_in_transaction, read_totals_in_transaction
+    
+    cursor = await db.execute(
+        """
+        SELECT game_id, player1_id, player2_id FROM active_games
+        WHERE chat_id = ? AND winner_id IS NULL AND ended_at IS NULL
+        """,
+        (chat_id,)
+    )
+    games = await cursor.fetchall()
+    if not games:
+        return {}
+    
+    await db.execute(
+        """
+        UPDATE active_games
+        SET ended_at = CURRENT_TIMESTAMP
+        WHERE chat_id = ? AND winner_id IS NULL AND ended_at IS NULL
+        """,
+        (chat_id,)
+    )
+    
+    refunded = []
+    for game in games:
+        if await release_escrow_in_transaction(db, game['game_id'], None):
+            refunded += [game['player1_id'], game['player2_id']]
+    
+    return await read_totals_in_transaction(db, refunded)
 
 
 async def force_end_chat_games(chat_id: int):
-    """Force end all active games in chat (when chat ends)"""
-    async with await get_db() as db:
-        await db.execute(
-            """
-            UPDATE active_games
-            SET ended_at = CURRENT_TIMESTAMP
-            WHERE chat_id = ? AND winner_id IS NULL
-            """,
-            (chat_id,)
-        )
-        await db.commit()
+    """Force end all active games in chat (when chat ends), refunding bets"""
+    async with transaction() as db:
+        totals = await end_chat_games_in_transaction(db, chat_id)
+    
+    discard_chat_sessions(chat_id)
+    boards['sunflowers'].update_many(totals)
 
 
 async def get_game_by_id(game_id: int) -> Optional[Dict[str, Any]]:
-    """Get game by ID"""
+    """Get game by ID (session store first, SQL for finished games)"""
+    game = _sessions.get(game_id)
+    if game is not None:
+        return game
+    
     async with await get_db() as db:
         cursor = await db.execute(
             """
-            SELECT game_type, player1_id, player2_id, bet_amount, game_state, current_turn, winner_id
+            SELECT game_type, player1_id, player2_id, bet_amount, game_state, current_turn,
+                   winner_id, ended_at
             FROM active_games
             WHERE game_id = ?
             """,
@@ -114,11 +358,112 @@ async def get_game_by_id(game_id: int) -> Optional[Dict[str, Any]]:
             return None
         
         return {
+            'game_id': game_id,
             'game_type': row['game_type'],
             'player1_id': row['player1_id'],
             'player2_id': row['player2_id'],
             'bet_amount': row['bet_amount'],
-            'state': json.loads(row['game_state']),
+            'state': decode_state(row['game_state']),
             'current_turn': row['current_turn'],
-            'winner_id': row['winner_id']
+            'winner_id': row['winner_id'],
+            'ended': row['ended_at'] is not None
         }
+
+
+# ============ TIMEOUTS & SETTLEMENT ============
+
+def pop_timed_out_games() -> List[Dict[str, Any]]:
+    """Sessions whose current turn ran past GAME_TURN_TIMEOUT_SECONDS (removed from the wheel)"""
+    return [
+        _sessions[game_id]
+        for game_id in _turn_timers.expire(time.monotonic())
+        if game_id in _sessions
+    ]
+
+
+async def _settle_in_transaction(db, game: Dict[str, Any], winner_id: Optional[int]) -> bool:
+    """
+    End one game and release its escrow (caller owns the transaction).
+    Winner gets both stakes + GAME_BASE_REWARD; a draw refunds each stake.
+    No-op returning False if the game had already ended, so retries never
+    pay twice.
+    """
+    from db.sunflowers import (
+        release_escrow_in_transaction, credit_many_in_transaction, deduct_sunflowers_in_transaction
+    )
+    
+    cursor = await db.execute(
+        """
+        UPDATE active_games
+        SET winner_id = ?, ended_at = CURRENT_TIMESTAMP, game_state = ?, current_turn = ?
+        WHERE game_id = ? AND winner_id IS NULL AND ended_at IS NULL
+        """,
+        (
+            winner_id, encode_state(game['game_type'], game['state']),
+            game['current_turn'], game['game_id']
+        )
+    )
+    if cursor.rowcount == 0:
+        return False
+    
+    bonus = settings.GAME_BASE_REWARD if winner_id is not None else 0
+    held = await release_escrow_in_transaction(db, game['game_id'], winner_id, bonus)
+    
+    if winner_id is not None and game['bet_amount'] > 0 and not held:
+        # Game started before bets were escrowed: the winner's own stake never
+        # left their balance, so only the loser's stake moves, and only if
+        # they can still cover it (nothing is paid out of thin air)
+        loser_id = game['player2_id'] if winner_id == game['player1_id'] else game['player1_id']
+        if await deduct_sunflowers_in_transaction(db, loser_id, game['bet_amount']) is not None:
+            await credit_many_in_transaction(db, [(winner_id, game['bet_amount'], 'game')])
+    
+    return True
+
+
+async def settle_game(game_id: int, winner_id: Optional[int]) -> Optional[Dict[int, int]]:
+    """
+    Finish a game in one transaction: final state, result, and both escrowed
+    stakes paid to the winner (winner_id None = draw: each stake is returned
+    from escrow to its owner).
+    Returns both players' sunflower totals afterwards, or None if the game
+    was already settled (retries and double clicks are no-ops).
+    """
+    from db.sunflowers import read_totals_in_transaction
+    
+    game = await get_game_by_id(game_id)
+    if game is None or game['ended']:
+        return None
+    
+    async with transaction() as db:
+        if not await _settle_in_transaction(db, game, winner_id):
+            return None
+        totals = await read_totals_in_transaction(db, (game['player1_id'], game['player2_id']))
+    
+    _drop_session(game_id)
+    boards['sunflowers'].update_many(totals)
+    
+    return totals
+
+
+async def forfeit_games(results: List[Tuple[Dict[str, Any], int]]) -> List[Dict[str, Any]]:
+    """
+    Batched settlement of timed-out games: (game, winner_id) pairs in one
+    transaction. Returns the games that were actually settled by this call.
+    """
+    from db.sunflowers import read_totals_in_transaction
+    
+    settled = []
+    async with transaction() as db:
+        for game, winner_id in results:
+            if await _settle_in_transaction(db, game, winner_id):
+                settled.append(game)
+        
+        totals = await read_totals_in_transaction(
+            db, [p for game in settled for p in (game['player1_id'], game['player2_id'])]
+        )
+    
+    for game, _ in results:
+        _drop_session(game['game_id'])
+    boards['sunflowers'].update_many(totals)
+    
+    return settled
@@ -1,14 +1,14 @@
 """
 Garden system - OWNS gardens table
 """
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from datetime import date
-from db.connection import get_db
+from db.connection import get_db, transaction
 
 
 async def create_garden(user_id: int) -> bool:
     """Create level 1 garden for user"""
-    async with await get_db() as db:
+    async with transaction() as db:
         try:
             await db.execute(
                 """
@@ -17,7 +17,6 @@ async def create_garden(user_id: int) -> bool:
                 """,
                 (user_id, date.today().isoformat())
             )
-            await db.commit()
             return True
         except:
             return False
@@ -37,67 +36,67 @@ async def get_garden(user_id: int) -> Optional[Tuple[int, str]]:
 async def harvest_garden(user_id: int) -> Optional[int]:
     """
     Harvest garden. Returns amount harvested or None if already harvested today.
+    The harvest date is claimed and the reward credited in one transaction.
     """
-    from db.sunflowers import add_sunflowers
-    
-    garden = await get_garden(user_id)
-    if not garden:
-        return None
-    
-    level, last_harvest = garden
-    today = date.today()
-    
-    if last_harvest:
-        last_date = date.fromisoformat(last_harvest)
-        if last_date >= today:
-            return None  # Already harvested today
-    
-    # Calculate reward: Level 1=20, Level 2=40, Level 3=60
-    reward = level * 20
+    from db.sunflowers import credit_many_in_transaction, read_totals_in_transaction
+    from db.leaderboards import boards
     
-    # Award sunflowers
-    await add_sunflowers(user_id, reward, 'game')
+    today = date.today().isoformat()
     
-    # Update last harvest
-    async with await get_db() as db:
+    async with transaction() as db:
+        cursor = await db.execute(
+            "SELECT level, last_harvest_date FROM gardens WHERE user_id = ?",
+            (user_id,)
+        )
+        row = await cursor.fetchone()
+        
+        if not row or (row['last_harvest_date'] and row['last_harvest_date'] >= today):
+            return None  # No garden, or already harvested today
+        
         await db.execute(
             "UPDATE gardens SET last_harvest_date = ? WHERE user_id = ?",
-            (today.isoformat(), user_id)
+            (today, user_id)
         )
-        await db.commit()
+        
+        # Calculate reward: Level 1=20, Level 2=40, Level 3=60
+        reward = row['level'] * 20
+        
+        await credit_many_in_transaction(db, [(user_id, reward, 'game')])
+        totals = await read_totals_in_transaction(db, [user_id])
     
+    boards['sunflowers'].update_many(totals)
     return reward
 
 
 async def upgrade_garden(user_id: int) -> bool:
     """Upgrade garden to next level (max 3)"""
-    async with await get_db() as db:
+    async with transaction() as db:
         cursor = await db.execute(
             "UPDATE gardens SET level = MIN(3, level + 1) WHERE user_id = ?",
             (user_id,)
         )
-        await db.commit()
         return cursor.rowcount > 0
 
 
 async def degrade_garden(user_id: int):
     """Downgrade garden by one level"""
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             "UPDATE gardens SET level = MAX(1, level - 1) WHERE user_id = ?",
             (user_id,)
         )
-        await db.commit()
 
 
-async def destroy_garden(user_id: int):
-    """Completely remove garden"""
-    async with await get_db() as db:
-        await db.execute(
-            "DELETE FROM gardens WHERE user_id = ?",
-            (user_id,)
-        )
-        await db.commit()
+async def destroy_gardens_in_transaction(db, user_ids: List[int]):
+    """Remove gardens for many users (caller owns the transaction)"""
+    if not user_ids:
+        return
+    
+    placeholders = ", ".join("?" * len(user_ids))
+    await db.execute(
+        f"DELETE FROM gardens WHERE user_id IN ({placeholders})",
+        user_ids
+    )
 
 
 async def has_garden(user_id: int) -> bool:
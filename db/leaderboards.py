@@ -0,0 +1,194 @@
+"""
+Leaderboards - OWNS leaderboard_snapshots table
+One in-memory Leaderboard per metric, updated by the owning modules after
+each committed change (db.streaks, db.sunflowers, db.ratings).
+Rankings are rebuilt from the source tables at startup unless a shutdown
+snapshot exists; the snapshot is consumed on load, so after a crash the
+next start falls back to a rebuild.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+from db.connection import get_db, transaction
+from config import settings
+
+
+METRICS = ('streaks', 'sunflowers', 'ratings')
+
+
+class Leaderboard:
+    """
+    All users with a positive score, kept as a sorted list of
+    (-score, user_id) keys plus a user_id -> score map.
+    top() is O(offset + k), rank() is a bisect.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[float, int]] = []
+        self._scores: Dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load(self, items: Iterable[Tuple[int, float]]):
+        """Replace contents with (user_id, score) pairs"""
+        self._scores = {user_id: score for user_id, score in items if score > 0}
+        self._keys = sorted((-score, user_id) for user_id, score in self._scores.items())
+
+    def remove(self, user_id: int):
+        score = self._scores.pop(user_id, None)
+        if score is None:
+            return
+
+        i = bisect_left(self._keys, (-score, user_id))
+        del self._keys[i]
+
+    def update(self, user_id: int, score: float):
+        """Set a user's score; non-positive scores drop them from the board"""
+        if self._scores.get(user_id) == score:
+            return
+
+        self.remove(user_id)
+        if score > 0:
+            self._scores[user_id] = score
+            insort(self._keys, (-score, user_id))
+
+    def update_many(self, scores: Dict[int, float]):
+        for user_id, score in scores.items():
+            self.update(user_id, score)
+
+    def top(self, k: int, offset: int = 0) -> List[Tuple[int, float]]:
+        """(user_id, score) for ranks offset+1 .. offset+k"""
+        return [(user_id, -neg) for neg, user_id in self._keys[offset:offset + k]]
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based rank, or None if the user isn't on the board"""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+
+        return bisect_left(self._keys, (-score, user_id)) + 1
+
+    def score(self, user_id: int) -> Optional[float]:
+        return self._scores.get(user_id)
+
+    def items(self) -> List[Tuple[int, float]]:
+        return [(user_id, -neg) for neg, user_id in self._keys]
+
+
+boards: Dict[str, Leaderboard] = {metric: Leaderboard() for metric in METRICS}
+
+# Global mean rating used for the Bayesian score of incremental updates;
+# refreshed whenever the ratings board is rebuilt
+_rating_mean = 3.0
+
+
+def rating_score(rating_sum: int, rating_count: int) -> float:
+    """
+    Bayesian-smoothed rating (same formula as db.ratings.recompute_rating_scores).
+    Users below MIN_RATINGS_FOR_DISPLAY score 0 and stay off the board.
+    """
+    if rating_count < settings.MIN_RATINGS_FOR_DISPLAY:
+        return 0.0
+
+    prior_weight = settings.RATING_PRIOR_WEIGHT
+    return round((prior_weight * _rating_mean + rating_sum) / (prior_weight + rating_count), 3)
+
+
+# ============ SOURCE REBUILDS ============
+
+async def rebuild_streaks_board():
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT user_id, current_days FROM streaks WHERE current_days > 0"
+        )
+        boards['streaks'].load((row[0], row[1]) for row in await cursor.fetchall())
+
+
+async def rebuild_sunflowers_board():
+    async with await get_db() as db:
+        cursor = await db.execute(
+            """
+            SELECT user_id, MAX(0, streak) + MAX(0, game) + MAX(0, gift) + MAX(0, rating)
+            FROM sunflower_balances
+            """
+        )
+        boards['sunflowers'].load((row[0], row[1]) for row in await cursor.fetchall())
+
+
+async def rebuild_ratings_board():
+    """Rebuild from rating_stats and refresh the global mean"""
+    global _rating_mean
+
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT user_id, rating_sum, rating_count FROM rating_stats"
+        )
+        rows = await cursor.fetchall()
+
+    total = sum(row[1] for row in rows)
+    count = sum(row[2] for row in rows)
+    _rating_mean = total / count if count else 3.0
+
+    boards['ratings'].load((row[0], rating_score(row[1], row[2])) for row in rows)
+
+
+_REBUILDERS = {
+    'streaks': rebuild_streaks_board,
+    'sunflowers': rebuild_sunflowers_board,
+    'ratings': rebuild_ratings_board,
+}
+
+
+# ============ SNAPSHOTS ============
+
+async def load_leaderboards():
+    """
+    Startup: load each board from its snapshot (then delete it) or rebuild
+    from the source table when there is none.
+    """
+    global _rating_mean
+
+    async with transaction() as db:
+        cursor = await db.execute(
+            "SELECT metric, user_id, score FROM leaderboard_snapshots"
+        )
+        rows = await cursor.fetchall()
+        await db.execute("DELETE FROM leaderboard_snapshots")
+
+    snapshots: Dict[str, List[Tuple[int, float]]] = {}
+    for metric, user_id, score in rows:
+        snapshots.setdefault(metric, []).append((user_id, score))
+
+    for metric in METRICS:
+        if metric in snapshots:
+            boards[metric].load(snapshots[metric])
+        else:
+            await _REBUILDERS[metric]()
+
+    if 'ratings' in snapshots:
+        async with await get_db() as db:
+            cursor = await db.execute(
+                "SELECT COALESCE(SUM(rating_sum), 0), COALESCE(SUM(rating_count), 0) FROM rating_stats"
+            )
+            total, count = await cursor.fetchone()
+        _rating_mean = total / count if count else 3.0
+
+
+async def discard_snapshot_in_transaction(db, metric: str):
+    """
+    Drop a metric's snapshot after its source table was rewritten (offline
+    repair scripts), so the next startup rebuilds that board instead.
+    Must run inside the rewriting transaction.
+    """
+    await db.execute("DELETE FROM leaderboard_snapshots WHERE metric = ?", (metric,))
+
+
+async def save_leaderboard_snapshot():
+    """Shutdown: persist every board in one transaction"""
+    async with transaction() as db:
+        await db.execute("DELETE FROM leaderboard_snapshots")
+        for metric in METRICS:
+            await db.executemany(
+                "INSERT INTO leaderboard_snapshots (metric, user_id, score) VALUES (?, ?, ?)",
+                ((metric, user_id, score) for user_id, score in boards[metric].items())
+            )
@@ -4,7 +4,9 @@ OWNS: waiting_users, active_chats, match_history
 """
 from typing import Optional, List
 from datetime import datetime, timedelta
-from db.connection import get_db
+from db.connection import get_db, transaction
+from db.games import discard_chat_sessions, end_chat_games_in_transaction
+from db.leaderboards import boards
 from config import settings
 
 
@@ -12,31 +14,35 @@ async def join_waiting_pool(
     user_id: int,
     gender: str,
     is_premium: bool,
-    rating: Optional[float],
-    rating_count: int,
     gender_preference: Optional[str]
 ):
-    """Add user to waiting pool"""
-    async with await get_db() as db:
+    """
+    Add user to waiting pool.
+    Rating is copied from the precomputed rating_scores row (no aggregation).
+    """
+    async with transaction() as db:
         await db.execute(
             """
             INSERT OR REPLACE INTO waiting_users
             (user_id, gender, is_premium, rating, rating_count, gender_preference, joined_at)
-            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            VALUES (
+                ?, ?, ?,
+                (SELECT score FROM rating_scores WHERE user_id = ?),
+                COALESCE((SELECT rating_count FROM rating_scores WHERE user_id = ?), 0),
+                ?, CURRENT_TIMESTAMP
+            )
             """,
-            (user_id, gender, 1 if is_premium else 0, rating, rating_count, gender_preference)
+            (user_id, gender, 1 if is_premium else 0, user_id, user_id, gender_preference)
         )
-        await db.commit()
 
 
 async def leave_waiting_pool(user_id: int):
     """Remove user from waiting pool"""
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             "DELETE FROM waiting_users WHERE user_id = ?",
             (user_id,)
         )
-        await db.commit()
 
 
 async def get_waiting_candidates(user_id: int) -> List[dict]:
@@ -78,54 +84,51 @@ async def create_match_atomic(user_a: int, user_b: int) -> int:
     
     Returns chat_id on success, 0 on failure.
     """
-    async with await get_db() as db:
-        async with db.execute("BEGIN IMMEDIATE"):
-            try:
-                # Step 1: Remove from waiting pool
-                await db.execute(
-                    "DELETE FROM waiting_users WHERE user_id IN (?, ?)",
-                    (user_a, user_b)
-                )
-                
-                # Step 2: Create active chat
-                cursor = await db.execute(
-                    """
-                    INSERT INTO active_chats (user_a, user_b, started_at)
-                    VALUES (?, ?, CURRENT_TIMESTAMP)
-                    """,
-                    (user_a, user_b)
-                )
-                chat_id = cursor.lastrowid
-                
-                # Step 3: Update user partners
-                await db.execute(
-                    "UPDATE users SET partner_id = ?, current_state = 'CHATTING' WHERE user_id = ?",
-                    (user_b, user_a)
-                )
-                
-                await db.execute(
-                    "UPDATE users SET partner_id = ?, current_state = 'CHATTING' WHERE user_id = ?",
-                    (user_a, user_b)
-                )
-                
-                # Step 4: Record match history
-                now = datetime.now().isoformat()
-                await db.execute(
-                    "INSERT OR REPLACE INTO match_history (user_id, partner_id, last_matched_at) VALUES (?, ?, ?)",
-                    (user_a, user_b, now)
-                )
-                await db.execute(
-                    "INSERT OR REPLACE INTO match_history (user_id, partner_id, last_matched_at) VALUES (?, ?, ?)",
-                    (user_b, user_a, now)
-                )
-                
-                await db.commit()
-                return chat_id
-                
-            except Exception as e:
-                await db.execute("ROLLBACK")
-                print(f"Match creation failed: {e}")
-                return 0
+    try:
+        async with transaction() as db:
+            # Step 1: Remove from waiting pool
+            await db.execute(
+                "DELETE FROM waiting_users WHERE user_id IN (?, ?)",
+                (user_a, user_b)
+            )
+            
+            # Step 2: Create active chat
+            cursor = await db.execute(
+                """
+                INSERT INTO active_chats (user_a, user_b, started_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                """,
+                (user_a, user_b)
+            )
+            chat_id = cursor.lastrowid
+            
+            # Step 3: Update user partners
+            await db.execute(
+                "UPDATE users SET partner_id = ?, current_state = 'CHATTING' WHERE user_id = ?",
+                (user_b, user_a)
+            )
+            
+            await db.execute(
+                "UPDATE users SET partner_id = ?, current_state = 'CHATTING' WHERE user_id = ?",
+                (user_a, user_b)
+            )
+            
+            # Step 4: Record match history
+            now = datetime.now().isoformat()
+            await db.execute(
+                "INSERT OR REPLACE INTO match_history (user_id, partner_id, last_matched_at) VALUES (?, ?, ?)",
+                (user_a, user_b, now)
+            )
+            await db.execute(
+                "INSERT OR REPLACE INTO match_history (user_id, partner_id, last_matched_at) VALUES (?, ?, ?)",
+                (user_b, user_a, now)
+            )
+        
+        return chat_id
+        
+    except Exception as e:
+        print(f"Match creation failed: {e}")
+        return 0
 
 
 async def end_chat_atomic(user_a: int, user_b: int):
@@ -138,59 +141,53 @@ async def end_chat_atomic(user_a: int, user_b: int):
     3. Clear partner references
     4. Create pending ratings
     """
-    async with await get_db() as db:
-        async with db.execute("BEGIN IMMEDIATE"):
-            try:
-                # Step 1: Get chat_id
-                cursor = await db.execute(
-                    """
-                    SELECT chat_id FROM active_chats
-                    WHERE (user_a = ? AND user_b = ?) OR (user_a = ? AND user_b = ?)
-                    """,
-                    (user_a, user_b, user_b, user_a)
-                )
-                chat_row = await cursor.fetchone()
-                
-                if chat_row:
-                    chat_id = chat_row['chat_id']
-                    
-                    # End active game
-                    await db.execute(
-                        """
-                        UPDATE active_games
-                        SET ended_at = CURRENT_TIMESTAMP
-                        WHERE chat_id = ? AND winner_id IS NULL
-                        """,
-                        (chat_id,)
-                    )
-                    
-                    # Delete active chat
-                    await db.execute(
-                        "DELETE FROM active_chats WHERE chat_id = ?",
-                        (chat_id,)
-                    )
+    refunded = {}
+    try:
+        async with transaction() as db:
+            # Step 1: Get chat_id
+            cursor = await db.execute(
+                """
+                SELECT chat_id FROM active_chats
+                WHERE (user_a = ? AND user_b = ?) OR (user_a = ? AND user_b = ?)
+                """,
+                (user_a, user_b, user_b, user_a)
+            )
+            chat_row = await cursor.fetchone()
+            
+            if chat_row:
+                chat_id = chat_row['chat_id']
                 
-                # Step 2: Clear partners
-                await db.execute(
-                    "UPDATE users SET partner_id = NULL WHERE user_id IN (?, ?)",
-                    (user_a, user_b)
-                )
+                # End active game, refunding its bets
+                refunded = await end_chat_games_in_transaction(db, chat_id)
                 
-                # Step 3: Create pending ratings
+                # Delete active chat
                 await db.execute(
-                    "INSERT OR IGNORE INTO pending_ratings (rater_id, rated_user_id) VALUES (?, ?)",
-                    (user_a, user_b)
+                    "DELETE FROM active_chats WHERE chat_id = ?",
+                    (chat_id,)
                 )
-                await db.execute(
-                    "INSERT OR IGNORE INTO pending_ratings (rater_id, rated_user_id) VALUES (?, ?)",
-                    (user_b, user_a)
-                )
-                
-                await db.commit()
-                
-            except Exception as e:
-                await db.execute("ROLLBACK")
-                print(f"Chat end failed: {e}")
+            
+            # Step 2: Clear partners
+            await db.execute(
+                "UPDATE users SET partner_id = NULL WHERE user_id IN (?, ?)",
+                (user_a, user_b)
+            )
+            
+            # Step 3: Create pending ratings
+            await db.execute(
+                "INSERT OR IGNORE INTO pending_ratings (rater_id, rated_user_id) VALUES (?, ?)",
+                (user_a, user_b)
+            )
+            await db.execute(
+                "INSERT OR IGNORE INTO pending_ratings (rater_id, rated_user_id) VALUES (?, ?)",
+                (user_b, user_a)
+            )
+    except Exception as e:
+        print(f"Chat end failed: {e}")
+        return
+    
+    if chat_row:
+        discard_chat_sessions(chat_row['chat_id'])
+        boards['sunflowers'].update_many(refunded)
 
 
 async def get_chat_id(user_id: int) -> Optional[int]:
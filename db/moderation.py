@@ -1,22 +1,63 @@
 """
-Moderation system - OWNS violations, bans, link_tracking, monitored_messages tables
+Moderation system - OWNS violations, bans, link_tracking, monitored_messages_* tables
+(the pre-partitioning monitored_messages table is migrated and dropped at startup)
 """
-from typing import Optional, Tuple
-from datetime import datetime, timedelta, date
-from db.connection import get_db
+from typing import Optional, Tuple, List, Dict, AsyncIterator
+from datetime import datetime, timedelta, date, timezone
+from db.connection import get_db, transaction
 
+# violations.occurred_at and user_last_ban.banned_at are UTC text in the
+# CURRENT_TIMESTAMP format, so they compare correctly as strings
+_UTC_FORMAT = '%Y-%m-%d %H:%M:%S'
 
-async def log_violation(user_id: int, violation_type: str):
-    """Log user violation"""
+
+def _to_utc_text(at: datetime) -> str:
+    """Local (naive) datetime -> UTC column text"""
+    return at.astimezone(timezone.utc).strftime(_UTC_FORMAT)
+
+
+def _from_utc_text(text: str) -> datetime:
+    """UTC column text -> local (naive) datetime"""
+    return datetime.strptime(text, _UTC_FORMAT).replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+async def log_violations_batch(rows: List[Tuple[int, str, datetime]]):
+    """Insert many (user_id, violation_type, occurred_at) rows in one transaction"""
+    if not rows:
+        return
+    
+    async with transaction() as db:
+        await db.executemany(
+            """
+            INSERT INTO violations (user_id, violation_type, occurred_at)
+            VALUES (?, ?, ?)
+            """,
+            [(user_id, violation_type, _to_utc_text(at)) for user_id, violation_type, at in rows]
+        )
+
+
+async def get_violations_since(cutoff: datetime) -> List[Tuple[int, str, datetime]]:
+    """
+    Get (user_id, violation_type, occurred_at) for violations after cutoff,
+    skipping each user's violations from before their last ban
+    """
     async with await get_db() as db:
-        await db.execute(
+        cursor = await db.execute(
             """
-            INSERT INTO violations (user_id, violation_type)
-            VALUES (?, ?)
+            SELECT v.user_id, v.violation_type, v.occurred_at
+            FROM violations v
+            LEFT JOIN user_last_ban b ON b.user_id = v.user_id
+            WHERE v.occurred_at > ?
+            AND (b.banned_at IS NULL OR v.occurred_at > b.banned_at)
+            ORDER BY v.occurred_at ASC
             """,
-            (user_id, violation_type)
+            (_to_utc_text(cutoff),)
         )
-        await db.commit()
+        rows = await cursor.fetchall()
+        return [
+            (row['user_id'], row['violation_type'], _from_utc_text(row['occurred_at']))
+            for row in rows
+        ]
 
 
 async def get_violation_count(user_id: int, violation_type: str, hours: int = 24) -> int:
@@ -30,16 +71,17 @@ async def get_violation_count(user_id: int, violation_type: str, hours: int = 24
             FROM violations
             WHERE user_id = ? AND violation_type = ? AND occurred_at > ?
             """,
-            (user_id, violation_type, cutoff.isoformat())
+            (user_id, violation_type, _to_utc_text(cutoff))
         )
         return (await cursor.fetchone())[0]
 
 
 async def ban_user(user_id: int, hours: int, reason: str):
     """Ban user for specified hours"""
-    banned_until = datetime.now() + timedelta(hours=hours)
+    now = datetime.now()
+    banned_until = now + timedelta(hours=hours)
     
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             """
             INSERT OR REPLACE INTO bans (user_id, reason, banned_until)
@@ -47,17 +89,19 @@ async def ban_user(user_id: int, hours: int, reason: str):
             """,
             (user_id, reason, banned_until.isoformat())
         )
-        await db.commit()
+        await db.execute(
+            "INSERT OR REPLACE INTO user_last_ban (user_id, banned_at) VALUES (?, ?)",
+            (user_id, _to_utc_text(now))
+        )
 
 
 async def unban_user(user_id: int):
     """Remove ban from user"""
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             "DELETE FROM bans WHERE user_id = ?",
             (user_id,)
         )
-        await db.commit()
 
 
 async def is_banned(user_id: int) -> Optional[Tuple[datetime, str]]:
@@ -103,7 +147,7 @@ async def increment_link_count(user_id: int):
     """Increment today's link count"""
     today = date.today()
     
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             """
             INSERT INTO link_tracking (user_id, date, count)
@@ -113,7 +157,74 @@ async def increment_link_count(user_id: int):
             """,
             (user_id, today.isoformat())
         )
-        await db.commit()
+
+
+async def get_link_counts(day: date) -> Dict[int, int]:
+    """Get every user's link count for a day (one scan, used to warm counters)"""
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT user_id, count FROM link_tracking WHERE date = ?",
+            (day.isoformat(),)
+        )
+        rows = await cursor.fetchall()
+        return {row['user_id']: row['count'] for row in rows}
+
+
+async def set_link_counts(day: date, counts: Dict[int, int]):
+    """Write back absolute link counts for a day in one transaction"""
+    if not counts:
+        return
+    
+    async with transaction() as db:
+        await db.executemany(
+            """
+            INSERT INTO link_tracking (user_id, date, count)
+            VALUES (?, ?, ?)
+            ON CONFLICT(user_id, date)
+            DO UPDATE SET count = MAX(count, excluded.count)
+            """,
+            [(user_id, day.isoformat(), count) for user_id, count in counts.items()]
+        )
+
+
+# ============ MONITORED MESSAGES (DAILY PARTITIONS) ============
+# Each day gets its own monitored_messages_YYYYMMDD table. Writes only touch
+# today's partition, reads walk partitions newest-first, and expired days are
+# dropped whole by the archiver instead of DELETE-ing rows.
+PARTITION_PREFIX = "monitored_messages_"
+
+_known_partitions = set()
+
+
+def _partition_name(day: date) -> str:
+    """Table name for a day's partition"""
+    return f"{PARTITION_PREFIX}{day.strftime('%Y%m%d')}"
+
+
+async def _ensure_partition(db, day: date) -> str:
+    """Create the day's partition on first use"""
+    name = _partition_name(day)
+    
+    if name not in _known_partitions:
+        await db.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {name} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id INTEGER NOT NULL,
+                sender_id INTEGER NOT NULL,
+                message_type TEXT NOT NULL,
+                content TEXT,
+                media_file_id TEXT,
+                sent_at TEXT NOT NULL
+            )
+            """
+        )
+        await db.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{name}_sender ON {name} (sender_id)"
+        )
+        _known_partitions.add(name)
+    
+    return name
 
 
 async def log_monitored_message(
@@ -123,42 +234,171 @@ async def log_monitored_message(
     content: Optional[str] = None,
     media_file_id: Optional[str] = None
 ):
-    """Log message for admin monitoring"""
-    async with await get_db() as db:
+    """Log message for admin monitoring (into today's partition)"""
+    now = datetime.now()
+    
+    async with transaction() as db:
+        table = await _ensure_partition(db, now.date())
         await db.execute(
-            """
-            INSERT INTO monitored_messages (chat_id, sender_id, message_type, content, media_file_id)
-            VALUES (?, ?, ?, ?, ?)
+            f"""
+            INSERT INTO {table} (chat_id, sender_id, message_type, content, media_file_id, sent_at)
+            VALUES (?, ?, ?, ?, ?, ?)
             """,
-            (chat_id, sender_id, message_type, content, media_file_id)
+            (chat_id, sender_id, message_type, content, media_file_id,
+             now.isoformat(sep=' ', timespec='seconds'))
+        )
+
+
+async def list_message_partitions() -> List[date]:
+    """Get days that still have a live partition, newest first"""
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+            (PARTITION_PREFIX + "%",)
         )
-        await db.commit()
+        rows = await cursor.fetchall()
+    
+    days = []
+    for row in rows:
+        suffix = row['name'][len(PARTITION_PREFIX):]
+        try:
+            days.append(datetime.strptime(suffix, "%Y%m%d").date())
+        except ValueError:
+            continue
+    
+    days.sort(reverse=True)
+    return days
 
 
 async def get_recent_messages(limit: int = 50):
-    """Get recent monitored messages"""
+    """Get recent monitored messages (newest partitions first)"""
+    messages = []
+    
+    for day in await list_message_partitions():
+        remaining = limit - len(messages)
+        if remaining <= 0:
+            break
+        
+        async with await get_db() as db:
+            cursor = await db.execute(
+                f"""
+                SELECT chat_id, sender_id, message_type, content, sent_at
+                FROM {_partition_name(day)}
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (remaining,)
+            )
+            rows = await cursor.fetchall()
+            messages.extend(dict(row) for row in rows)
+    
+    return messages
+
+
+async def search_live_messages(sender_id: int, limit: int = 50):
+    """Get a sender's messages from live partitions, newest first"""
+    messages = []
+    
+    for day in await list_message_partitions():
+        remaining = limit - len(messages)
+        if remaining <= 0:
+            break
+        
+        async with await get_db() as db:
+            cursor = await db.execute(
+                f"""
+                SELECT chat_id, sender_id, message_type, content, sent_at
+                FROM {_partition_name(day)}
+                WHERE sender_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (sender_id, remaining)
+            )
+            rows = await cursor.fetchall()
+            messages.extend(dict(row) for row in rows)
+    
+    return messages
+
+
+async def iter_partition_messages(day: date, chunk_size: int = 1000) -> AsyncIterator[List[dict]]:
+    """Stream a partition's rows in insertion order, chunk_size rows at a time"""
     async with await get_db() as db:
         cursor = await db.execute(
+            f"""
+            SELECT id, chat_id, sender_id, message_type, content, media_file_id, sent_at
+            FROM {_partition_name(day)}
+            ORDER BY id ASC
             """
-            SELECT chat_id, sender_id, message_type, content, sent_at
+        )
+        
+        while True:
+            rows = await cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [dict(row) for row in rows]
+
+
+async def drop_message_partition(day: date):
+    """Drop a day's partition (after it has been archived)"""
+    name = _partition_name(day)
+    
+    async with transaction() as db:
+        await db.execute(f"DROP TABLE IF EXISTS {name}")
+    
+    _known_partitions.discard(name)
+
+
+async def migrate_legacy_messages() -> int:
+    """
+    One-time startup migration: copy the pre-partitioning monitored_messages
+    table into daily partitions by date(sent_at), then drop it. Old days are
+    archived and dropped by the archiver like any other partition.
+    Returns rows moved (0 once the legacy table is gone).
+    """
+    async with transaction() as db:
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monitored_messages'"
+        )
+        if await cursor.fetchone() is None:
+            return 0
+        
+        cursor = await db.execute(
+            """
+            SELECT DISTINCT date(COALESCE(sent_at, CURRENT_TIMESTAMP)) AS day
             FROM monitored_messages
-            ORDER BY sent_at DESC
-            LIMIT ?
-            """,
-            (limit,)
+            """
         )
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        days = [date.fromisoformat(row['day']) for row in await cursor.fetchall()]
+        
+        moved = 0
+        for day in days:
+            table = await _ensure_partition(db, day)
+            cursor = await db.execute(
+                f"""
+                INSERT INTO {table} (chat_id, sender_id, message_type, content, media_file_id, sent_at)
+                SELECT chat_id, sender_id, message_type, content, media_file_id,
+                       COALESCE(sent_at, CURRENT_TIMESTAMP)
+                FROM monitored_messages
+                WHERE date(COALESCE(sent_at, CURRENT_TIMESTAMP)) = ?
+                ORDER BY rowid
+                """,
+                (day.isoformat(),)
+            )
+            moved += cursor.rowcount
+        
+        await db.execute("DROP TABLE monitored_messages")
+    
+    return moved
 
 
 async def clean_expired_bans():
     """Remove expired bans"""
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             "DELETE FROM bans WHERE banned_until <= ?",
             (datetime.now().isoformat(),)
         )
-        await db.commit()
 
 
 async def get_all_user_ids():
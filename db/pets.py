@@ -1,8 +1,8 @@
 """
 Pet system - OWNS pets table
 """
-from typing import List, Tuple
-from db.connection import get_db
+from typing import List, Set, Tuple
+from db.connection import get_db, transaction
 from config import settings
 
 
@@ -10,7 +10,7 @@ async def add_pet(user_id: int, pet_type: str, saves: int = 1) -> bool:
     """
     Add pet to user. Returns False if max pets reached.
     """
-    async with await get_db() as db:
+    async with transaction() as db:
         # Check current count
         cursor = await db.execute(
             "SELECT COUNT(*) FROM pets WHERE user_id = ?",
@@ -29,55 +29,9 @@ async def add_pet(user_id: int, pet_type: str, saves: int = 1) -> bool:
             """,
             (user_id, pet_type, saves)
         )
-        await db.commit()
         return True
 
 
-async def use_pet(user_id: int) -> bool:
-    """
-    Use one pet to save streak.
-    Auto-consumes pet.
-    Returns True if pet was used, False if no pets available.
-    """
-    async with await get_db() as db:
-        async with db.execute("BEGIN"):
-            # Get oldest pet
-            cursor = await db.execute(
-                """
-                SELECT id, saves_remaining
-                FROM pets
-                WHERE user_id = ?
-                ORDER BY id ASC
-                LIMIT 1
-                """,
-                (user_id,)
-            )
-            row = await cursor.fetchone()
-            
-            if not row:
-                await db.execute("ROLLBACK")
-                return False
-            
-            pet_id = row['id']
-            saves = row['saves_remaining']
-            
-            if saves > 1:
-                # Decrement saves
-                await db.execute(
-                    "UPDATE pets SET saves_remaining = saves_remaining - 1 WHERE id = ?",
-                    (pet_id,)
-                )
-            else:
-                # Remove pet
-                await db.execute(
-                    "DELETE FROM pets WHERE id = ?",
-                    (pet_id,)
-                )
-            
-            await db.commit()
-            return True
-
-
 async def get_pets(user_id: int) -> List[Tuple[int, str, int]]:
     """Get all pets for user as (id, type, saves)"""
     async with await get_db() as db:
@@ -102,3 +56,44 @@ async def get_pet_count(user_id: int) -> int:
             (user_id,)
         )
         return (await cursor.fetchone())[0]
+
+
+async def use_pets_in_transaction(db, user_ids: List[int]) -> Set[int]:
+    """
+    Consume the oldest pet of each user in user_ids (set-wise).
+    Must run inside a transaction.
+    Returns the user_ids that had a pet.
+    """
+    if not user_ids:
+        return set()
+    
+    placeholders = ", ".join("?" * len(user_ids))
+    cursor = await db.execute(
+        f"""
+        SELECT user_id, MIN(id) AS pet_id
+        FROM pets
+        WHERE user_id IN ({placeholders})
+        GROUP BY user_id
+        """,
+        user_ids
+    )
+    rows = await cursor.fetchall()
+    
+    if not rows:
+        return set()
+    
+    pet_ids = [row['pet_id'] for row in rows]
+    pet_placeholders = ", ".join("?" * len(pet_ids))
+    
+    # Last save used: remove pet
+    await db.execute(
+        f"DELETE FROM pets WHERE id IN ({pet_placeholders}) AND saves_remaining <= 1",
+        pet_ids
+    )
+    # Otherwise decrement saves
+    await db.execute(
+        f"UPDATE pets SET saves_remaining = saves_remaining - 1 WHERE id IN ({pet_placeholders})",
+        pet_ids
+    )
+    
+    return {row['user_id'] for row in rows}
@@ -1,74 +1,325 @@
 """
-Rating system - OWNS ratings and pending_ratings tables
+Rating system - OWNS ratings, rating_stats, rating_scores and pending_ratings tables
 """
+from array import array
+from datetime import datetime
 from typing import Optional, Tuple, List
-from db.connection import get_db
+from db.connection import get_db, transaction
+from db.leaderboards import boards, discard_snapshot_in_transaction, rating_score, rebuild_ratings_board
+from db.users import UserState
 from config import settings
 
 
-async def add_rating(rated_user_id: int, rater_user_id: int, rating: int):
-    """Add or update rating and remove from pending"""
-    async with await get_db() as db:
-        async with db.execute("BEGIN"):
-            # Insert rating
-            await db.execute(
-                """
-                INSERT OR REPLACE INTO ratings (rated_user_id, rater_user_id, rating)
-                VALUES (?, ?, ?)
-                """,
-                (rated_user_id, rater_user_id, rating)
-            )
-            
-            # Remove from pending
+def _histogram_delta(new_rating: int, old_rating: Optional[int]) -> List[int]:
+    """Per-star (1-5) count changes for a rating insert or re-rate"""
+    delta = [0] * 5
+    delta[new_rating - 1] += 1
+    if old_rating is not None:
+        delta[old_rating - 1] -= 1
+    return delta
+
+
+async def _apply_rating(db, rated_user_id: int, rater_user_id: int, rating: int) -> float:
+    """
+    Upsert a rating and update rating_stats.
+    Must run inside a transaction; a re-rate replaces the old value
+    instead of counting twice.
+    Returns the rated user's new leaderboard score.
+    """
+    # Previous rating from this rater (re-rate case)
+    cursor = await db.execute(
+        """
+        SELECT rating FROM ratings
+        WHERE rated_user_id = ? AND rater_user_id = ?
+        """,
+        (rated_user_id, rater_user_id)
+    )
+    row = await cursor.fetchone()
+    old_rating = row['rating'] if row else None
+    
+    # Insert rating
+    await db.execute(
+        """
+        INSERT OR REPLACE INTO ratings (rated_user_id, rater_user_id, rating)
+        VALUES (?, ?, ?)
+        """,
+        (rated_user_id, rater_user_id, rating)
+    )
+    
+    # Update aggregates
+    delta_sum = rating - (old_rating or 0)
+    delta_count = 0 if old_rating is not None else 1
+    await db.execute(
+        """
+        INSERT INTO rating_stats (user_id, rating_sum, rating_count, r1, r2, r3, r4, r5)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            rating_sum = rating_sum + excluded.rating_sum,
+            rating_count = rating_count + excluded.rating_count,
+            r1 = r1 + excluded.r1,
+            r2 = r2 + excluded.r2,
+            r3 = r3 + excluded.r3,
+            r4 = r4 + excluded.r4,
+            r5 = r5 + excluded.r5
+        """,
+        (rated_user_id, delta_sum, delta_count, *_histogram_delta(rating, old_rating))
+    )
+    
+    cursor = await db.execute(
+        "SELECT rating_sum, rating_count FROM rating_stats WHERE user_id = ?",
+        (rated_user_id,)
+    )
+    row = await cursor.fetchone()
+    return rating_score(row['rating_sum'], row['rating_count'])
+
+
+async def submit_rating(rated_user_id: int, rater_user_id: int, rating: int) -> Optional[bool]:
+    """
+    ATOMIC TRANSACTION: Full rating submission.
+    
+    Steps:
+    1. Delete the (unexpired) pending row - the guard: without one nothing
+       is written, so a replayed callback cannot earn the reward again
+    2. Upsert rating (+ rating_stats)
+    3. Credit rater and rated user for a 4+ star rating
+    4. RATING → IDLE if the rater has nothing left to rate
+    
+    Returns True if the rater still has pending ratings, False if not,
+    None if there was no pending rating to submit.
+    """
+    from db.sunflowers import credit_many_in_transaction, read_totals_in_transaction
+    
+    async with transaction() as db:
+        # Step 1: Guard
+        cursor = await db.execute(
+            """
+            DELETE FROM pending_ratings
+            WHERE rater_id = ? AND rated_user_id = ? AND created_at > datetime('now', ?)
+            """,
+            (rater_user_id, rated_user_id, f"-{settings.PENDING_RATING_TTL_HOURS} hours")
+        )
+        if cursor.rowcount == 0:
+            return None
+        
+        # Step 2: Rating
+        score = await _apply_rating(db, rated_user_id, rater_user_id, rating)
+        
+        # Step 3: Rewards
+        totals = {}
+        if rating >= 4:
+            await credit_many_in_transaction(db, [
+                (rater_user_id, settings.RATING_REWARD_RATER, 'rating'),
+                (rated_user_id, settings.RATING_REWARD_RATED, 'rating'),
+            ])
+            totals = await read_totals_in_transaction(db, [rater_user_id, rated_user_id])
+        
+        # Step 4: State
+        cursor = await db.execute(
+            """
+            SELECT 1 FROM pending_ratings
+            WHERE rater_id = ? AND created_at > datetime('now', ?)
+            LIMIT 1
+            """,
+            (rater_user_id, f"-{settings.PENDING_RATING_TTL_HOURS} hours")
+        )
+        more_pending = await cursor.fetchone() is not None
+        
+        if not more_pending:
             await db.execute(
                 """
-                DELETE FROM pending_ratings
-                WHERE rater_id = ? AND rated_user_id = ?
+                UPDATE users
+                SET current_state = ?, last_active = CURRENT_TIMESTAMP
+                WHERE user_id = ? AND current_state = ?
                 """,
-                (rater_user_id, rated_user_id)
+                (UserState.IDLE, rater_user_id, UserState.RATING)
             )
-            
-            await db.commit()
+    
+    boards['ratings'].update(rated_user_id, score)
+    boards['sunflowers'].update_many(totals)
+    return more_pending
 
 
 async def get_average_rating(user_id: int) -> Optional[Tuple[float, int]]:
     """
-    Get average rating and count.
+    Get average rating and count (single rating_stats lookup).
     Returns (avg, count) if count >= MIN_RATINGS_FOR_DISPLAY, else None.
     """
     async with await get_db() as db:
         cursor = await db.execute(
             """
-            SELECT AVG(rating), COUNT(*)
-            FROM ratings
-            WHERE rated_user_id = ?
+            SELECT rating_sum, rating_count
+            FROM rating_stats
+            WHERE user_id = ?
             """,
             (user_id,)
         )
         row = await cursor.fetchone()
         
-        if row and row[1] >= settings.MIN_RATINGS_FOR_DISPLAY:
-            return (round(row[0], 1), row[1])
+        if row and row['rating_count'] >= settings.MIN_RATINGS_FOR_DISPLAY:
+            return (round(row['rating_sum'] / row['rating_count'], 1), row['rating_count'])
         
         return None
 
 
+async def get_rating_histogram(user_id: int) -> List[int]:
+    """Get counts of 1..5 star ratings received"""
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT r1, r2, r3, r4, r5 FROM rating_stats WHERE user_id = ?",
+            (user_id,)
+        )
+        row = await cursor.fetchone()
+        return list(row) if row else [0] * 5
+
+
+async def rebuild_rating_stats() -> int:
+    """
+    Recompute rating_stats from the ratings table (backfill / repair).
+    Returns number of users with stats.
+    """
+    async with transaction() as db:
+        await db.execute("DELETE FROM rating_stats")
+        cursor = await db.execute(
+            """
+            INSERT INTO rating_stats (user_id, rating_sum, rating_count, r1, r2, r3, r4, r5)
+            SELECT rated_user_id, SUM(rating), COUNT(*),
+                   SUM(rating = 1), SUM(rating = 2), SUM(rating = 3),
+                   SUM(rating = 4), SUM(rating = 5)
+            FROM ratings
+            GROUP BY rated_user_id
+            """
+        )
+        await discard_snapshot_in_transaction(db, 'ratings')
+    
+    await rebuild_ratings_board()
+    return cursor.rowcount
+
+
+async def recompute_rating_scores(prior_weight: int) -> Tuple[int, int]:
+    """
+    Recompute Bayesian-smoothed scores for all users in one streaming pass
+    over ratings and replace rating_scores.
+    score = (prior_weight * global_mean + sum) / (prior_weight + count)
+    Returns (rows_scanned, users_scored).
+    """
+    user_ids = array('q')
+    sums = array('q')
+    counts = array('q')
+    rows_scanned = 0
+    
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT rated_user_id, rating FROM ratings ORDER BY rated_user_id"
+        )
+        
+        while True:
+            rows = await cursor.fetchmany(5000)
+            if not rows:
+                break
+            
+            for user_id, rating in rows:
+                if not user_ids or user_ids[-1] != user_id:
+                    user_ids.append(user_id)
+                    sums.append(0)
+                    counts.append(0)
+                sums[-1] += rating
+                counts[-1] += 1
+            
+            rows_scanned += len(rows)
+        
+    global_mean = sum(sums) / rows_scanned if rows_scanned else 3.0
+    prior = prior_weight * global_mean
+    computed_at = datetime.now().isoformat()
+    
+    async with transaction() as db:
+        await db.execute("DELETE FROM rating_scores")
+        await db.executemany(
+            """
+            INSERT INTO rating_scores (user_id, score, rating_count, computed_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (
+                (user_ids[i], round((prior + sums[i]) / (prior_weight + counts[i]), 3), counts[i], computed_at)
+                for i in range(len(user_ids))
+            )
+        )
+    
+    return rows_scanned, len(user_ids)
+
+
 async def get_pending_ratings(user_id: int) -> List[int]:
-    """Get list of user_ids that this user needs to rate"""
+    """Get list of user_ids that this user needs to rate (unexpired only)"""
     async with await get_db() as db:
         cursor = await db.execute(
             """
             SELECT rated_user_id
             FROM pending_ratings
-            WHERE rater_id = ?
+            WHERE rater_id = ? AND created_at > datetime('now', ?)
             ORDER BY created_at ASC
             """,
-            (user_id,)
+            (user_id, f"-{settings.PENDING_RATING_TTL_HOURS} hours")
         )
         rows = await cursor.fetchall()
         return [row['rated_user_id'] for row in rows]
 
 
+async def expire_pending_ratings(ttl_hours: int, batch_size: int) -> Tuple[int, int]:
+    """
+    Delete pending ratings older than ttl_hours in batches of batch_size
+    (one transaction per batch) and move raters left with nothing to rate
+    from RATING back to IDLE.
+    Returns (rows_deleted, users_released).
+    """
+    deleted = 0
+    released = 0
+    
+    while True:
+        async with await get_db() as db:
+            cursor = await db.execute(
+                """
+                SELECT rater_id, rated_user_id
+                FROM pending_ratings
+                WHERE created_at <= datetime('now', ?)
+                LIMIT ?
+                """,
+                (f"-{ttl_hours} hours", batch_size)
+            )
+            rows = [(row['rater_id'], row['rated_user_id']) for row in await cursor.fetchall()]
+        
+        if not rows:
+            break
+        
+        raters = {rater_id for rater_id, _ in rows}
+        
+        async with transaction() as db:
+            await db.executemany(
+                "DELETE FROM pending_ratings WHERE rater_id = ? AND rated_user_id = ?",
+                rows
+            )
+            
+            placeholders = ", ".join("?" * len(raters))
+            cursor = await db.execute(
+                f"""
+                UPDATE users
+                SET current_state = ?, last_active = CURRENT_TIMESTAMP
+                WHERE user_id IN ({placeholders})
+                AND current_state = ?
+                AND NOT EXISTS (
+                    SELECT 1 FROM pending_ratings p WHERE p.rater_id = users.user_id
+                )
+                """,
+                (UserState.IDLE, *raters, UserState.RATING)
+            )
+            released += cursor.rowcount
+        
+        deleted += len(rows)
+        
+        if len(rows) < batch_size:
+            break
+    
+    return deleted, released
+
+
 async def has_pending_rating(user_id: int, rated_user_id: int) -> bool:
     """Check if user has specific pending rating"""
     async with await get_db() as db:
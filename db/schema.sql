@@ -2,3 +2,267 @@ CREATE TABLE IF NOT EXISTS test (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT
 );
+
+-- ============ BASE TABLES ============
+-- Owned by the db.* module named on each; everything below builds on them,
+-- so they have to exist before the indexes and derived tables that follow.
+
+-- db.users
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    gender TEXT,
+    current_state TEXT NOT NULL DEFAULT 'NEW'
+        CHECK (current_state IN ('NEW', 'AGREED', 'IDLE', 'SEARCHING', 'CHATTING', 'RATING')),
+    partner_id INTEGER,
+    premium_until TEXT,
+    temp_premium_last_used TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- db.matchmaking
+CREATE TABLE IF NOT EXISTS waiting_users (
+    user_id INTEGER PRIMARY KEY,
+    gender TEXT,
+    is_premium INTEGER NOT NULL DEFAULT 0,
+    rating REAL,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    gender_preference TEXT,
+    joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS active_chats (
+    chat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_a INTEGER NOT NULL,
+    user_b INTEGER NOT NULL,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS match_history (
+    user_id INTEGER NOT NULL,
+    partner_id INTEGER NOT NULL,
+    last_matched_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, partner_id)
+);
+
+-- db.ratings
+CREATE TABLE IF NOT EXISTS ratings (
+    rated_user_id INTEGER NOT NULL,
+    rater_user_id INTEGER NOT NULL,
+    rating INTEGER NOT NULL CHECK (rating BETWEEN 1 AND 5),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (rated_user_id, rater_user_id)
+);
+
+CREATE TABLE IF NOT EXISTS pending_ratings (
+    rater_id INTEGER NOT NULL,
+    rated_user_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (rater_id, rated_user_id)
+);
+
+-- db.sunflowers
+CREATE TABLE IF NOT EXISTS sunflower_ledger (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- db.streaks
+CREATE TABLE IF NOT EXISTS streaks (
+    user_id INTEGER PRIMARY KEY,
+    current_days INTEGER NOT NULL DEFAULT 0,
+    last_active_date TEXT
+);
+
+-- db.pets
+CREATE TABLE IF NOT EXISTS pets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    pet_type TEXT NOT NULL,
+    saves_remaining INTEGER NOT NULL DEFAULT 1
+);
+
+-- db.gardens
+CREATE TABLE IF NOT EXISTS gardens (
+    user_id INTEGER PRIMARY KEY,
+    level INTEGER NOT NULL DEFAULT 1,
+    last_harvest_date TEXT
+);
+
+-- db.games
+CREATE TABLE IF NOT EXISTS active_games (
+    game_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INTEGER NOT NULL,
+    game_type TEXT NOT NULL,
+    player1_id INTEGER NOT NULL,
+    player2_id INTEGER NOT NULL,
+    bet_amount INTEGER NOT NULL DEFAULT 0,
+    game_state BLOB,
+    current_turn INTEGER,
+    winner_id INTEGER,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ended_at TIMESTAMP
+);
+
+-- db.moderation
+CREATE TABLE IF NOT EXISTS violations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    violation_type TEXT NOT NULL,
+    occurred_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS bans (
+    user_id INTEGER PRIMARY KEY,
+    reason TEXT,
+    banned_until TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS link_tracking (
+    user_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, date)
+);
+
+-- ============ DERIVED TABLES & INDEXES ============
+
+-- When each user was last banned (db.moderation.ban_user), kept after the
+-- ban itself expires: violations before it are not counted again when the
+-- auto-ban windows are rebuilt at startup. UTC, like violations.occurred_at
+CREATE TABLE IF NOT EXISTS user_last_ban (
+    user_id INTEGER PRIMARY KEY,
+    banned_at TEXT NOT NULL
+);
+
+-- Materialized rating aggregates, maintained by db.ratings.submit_rating
+CREATE TABLE IF NOT EXISTS rating_stats (
+    user_id INTEGER PRIMARY KEY,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    r1 INTEGER NOT NULL DEFAULT 0,
+    r2 INTEGER NOT NULL DEFAULT 0,
+    r3 INTEGER NOT NULL DEFAULT 0,
+    r4 INTEGER NOT NULL DEFAULT 0,
+    r5 INTEGER NOT NULL DEFAULT 0
+);
+
+-- Bayesian-smoothed rating per user, recomputed by services.rating_scores
+CREATE TABLE IF NOT EXISTS rating_scores (
+    user_id INTEGER PRIMARY KEY,
+    score REAL NOT NULL,
+    rating_count INTEGER NOT NULL,
+    computed_at TEXT NOT NULL
+);
+
+-- Keeps get_pending_ratings an index-range scan (rater_id, ORDER BY created_at)
+CREATE INDEX IF NOT EXISTS idx_pending_ratings_rater_created
+    ON pending_ratings (rater_id, created_at);
+
+-- Lets the expiry sweeper find old rows without a full scan
+CREATE INDEX IF NOT EXISTS idx_pending_ratings_created
+    ON pending_ratings (created_at);
+
+-- Materialized per-source balances, updated with every sunflower_ledger insert
+CREATE TABLE IF NOT EXISTS sunflower_balances (
+    user_id INTEGER PRIMARY KEY,
+    streak INTEGER NOT NULL DEFAULT 0,
+    game INTEGER NOT NULL DEFAULT 0,
+    gift INTEGER NOT NULL DEFAULT 0,
+    rating INTEGER NOT NULL DEFAULT 0
+);
+
+-- Ledger compaction: one checkpoint per (user, source) summarizing every
+-- entry moved to sunflower_ledger_archive (rowid <= through_rowid)
+CREATE TABLE IF NOT EXISTS sunflower_checkpoints (
+    user_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    through_rowid INTEGER NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, source)
+);
+
+CREATE TABLE IF NOT EXISTS sunflower_ledger_archive AS
+    SELECT * FROM sunflower_ledger WHERE 0;
+
+-- Nightly streak job scans by last_active_date
+CREATE INDEX IF NOT EXISTS idx_streaks_last_active
+    ON streaks (last_active_date);
+
+-- Streaks a pet has already saved for their current gap (db.streaks): one pet
+-- covers the whole gap, so the nightly job skips them until the user is back
+CREATE TABLE IF NOT EXISTS streak_pet_saves (
+    user_id INTEGER PRIMARY KEY
+);
+
+-- Leaderboard state written at shutdown and consumed by the next startup
+-- (db.leaderboards); empty while the bot is running
+CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
+    metric TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (metric, user_id)
+);
+
+-- Only unfinished games; stays small however much game history piles up
+CREATE INDEX IF NOT EXISTS idx_active_games_open
+    ON active_games (chat_id)
+    WHERE winner_id IS NULL AND ended_at IS NULL;
+
+-- Bets held from game accept until the game is settled or abandoned
+-- (db.sunflowers); one row per (game, player, source the stake came from)
+CREATE TABLE IF NOT EXISTS game_escrow (
+    game_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (game_id, user_id, source)
+);
+
+-- ============ ONE-TIME MIGRATIONS ============
+-- Each runs while its name is missing from schema_migrations, and
+-- is safe to re-run if startup dies halfway.
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- sunflower_balances was added after the ledger: fill it from checkpoints +
+-- ledger once, replacing any rows written before the backfill, and drop a
+-- leaderboard snapshot taken from those rows
+DELETE FROM sunflower_balances
+WHERE NOT EXISTS (SELECT 1 FROM schema_migrations WHERE name = 'sunflower_balances_backfill');
+
+INSERT INTO sunflower_balances (user_id, streak, game, gift, rating)
+SELECT user_id,
+       SUM(CASE WHEN source = 'streak' THEN amount ELSE 0 END),
+       SUM(CASE WHEN source = 'game' THEN amount ELSE 0 END),
+       SUM(CASE WHEN source = 'gift' THEN amount ELSE 0 END),
+       SUM(CASE WHEN source = 'rating' THEN amount ELSE 0 END)
+FROM (
+    SELECT user_id, source, amount FROM sunflower_checkpoints
+    UNION ALL
+    SELECT user_id, source, amount FROM sunflower_ledger
+)
+WHERE NOT EXISTS (SELECT 1 FROM schema_migrations WHERE name = 'sunflower_balances_backfill')
+GROUP BY user_id;
+
+DELETE FROM leaderboard_snapshots
+WHERE metric = 'sunflowers'
+AND NOT EXISTS (SELECT 1 FROM schema_migrations WHERE name = 'sunflower_balances_backfill');
+
+INSERT OR IGNORE INTO schema_migrations (name) VALUES ('sunflower_balances_backfill');
+
+-- violations.occurred_at is UTC 'YYYY-MM-DD HH:MM:SS' (the column default);
+-- the batch writer used to store local isoformat() with a 'T'. Converted
+-- rows lose the 'T', so a re-run never shifts a row twice
+UPDATE violations
+SET occurred_at = datetime(substr(replace(occurred_at, 'T', ' '), 1, 19), 'utc')
+WHERE occurred_at LIKE '%T%'
+AND NOT EXISTS (SELECT 1 FROM schema_migrations WHERE name = 'violations_utc_occurred_at');
+
+INSERT OR IGNORE INTO schema_migrations (name) VALUES ('violations_utc_occurred_at');
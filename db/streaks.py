@@ -1,110 +1,273 @@
 """
-Streak management - OWNS streaks table
+Streak management - OWNS streaks, streak_pet_saves tables
+Breaks are evaluated by the nightly job (evaluate_broken_streaks); the
+per-request path (update_streak) only records today's activity.
+One pet saves a whole gap: the streak is held (no days added, no reward)
+until the user is active again.
 """
-from datetime import date, datetime
-from db.connection import get_db
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from db.connection import get_db, transaction
+from db.leaderboards import boards
 from config import settings
 
 
+class DailyActivitySet:
+    """
+    Users already counted today, so repeat /find calls skip the DB.
+    Ids live in a sorted array('q') (8 bytes each) plus a small unsorted
+    set of recent additions that is sorted and merged in (slice copies
+    between insertion points, no full re-sort) once it grows past
+    merge_threshold. Everything is dropped at the date boundary.
+    """
+
+    def __init__(self, merge_threshold: int = 4096):
+        self.day = date.today()
+        self.merge_threshold = merge_threshold
+        self._sorted = array('q')
+        self._recent: Set[int] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _rotate_if_needed(self):
+        today = date.today()
+        if today != self.day:
+            self.day = today
+            self._sorted = array('q')
+            self._recent = set()
+
+    def __contains__(self, user_id: int) -> bool:
+        self._rotate_if_needed()
+
+        if user_id in self._recent:
+            return True
+
+        i = bisect_left(self._sorted, user_id)
+        return i < len(self._sorted) and self._sorted[i] == user_id
+
+    def check(self, user_id: int) -> bool:
+        """Membership test that also counts hits/misses"""
+        if user_id in self:
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        return False
+
+    def add(self, user_id: int):
+        if user_id in self:
+            return
+
+        self._recent.add(user_id)
+        if len(self._recent) >= self.merge_threshold:
+            self._merge_recent()
+
+    def _merge_recent(self):
+        """Sort only the small buffer and splice it into the array in one linear pass"""
+        merged = array('q')
+        start = 0
+        for user_id in sorted(self._recent):
+            i = bisect_left(self._sorted, user_id, start)
+            merged += self._sorted[start:i]
+            merged.append(user_id)
+            start = i
+        merged += self._sorted[start:]
+
+        self._sorted = merged
+        self._recent = set()
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._recent)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'users_today': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'bytes': self._sorted.itemsize * len(self._sorted) + len(self._recent) * 8,
+        }
+
+
+_active_today = DailyActivitySet()
+
+
+def get_activity_cache_stats() -> Dict[str, float]:
+    """Hit rate and size of the already-active-today cache"""
+    return _active_today.stats()
+
+
+def _streak_reward(streak_days: int) -> int:
+    """Sunflowers for a streak day, with multiplier"""
+    multiplier = 1.0
+
+    if streak_days >= 30:
+        multiplier = settings.STREAK_30D_MULTIPLIER
+    elif streak_days >= 7:
+        multiplier = settings.STREAK_7D_MULTIPLIER
+
+    return int(settings.BASE_STREAK_REWARD * multiplier)
+
+
+async def _get_streak_row(db, user_id: int):
+    cursor = await db.execute(
+        "SELECT current_days, last_active_date FROM streaks WHERE user_id = ?",
+        (user_id,)
+    )
+    return await cursor.fetchone()
+
+
 async def update_streak(user_id: int):
     """
-    Update user's streak based on today's activity.
-    Awards sunflowers if eligible.
-    Uses pets if streak would break.
+    Record today's activity.
+    Continues the streak (and awards sunflowers if eligible) when the user
+    was active yesterday, resumes it unchanged after a gap a pet saved,
+    otherwise starts a new one. The row is re-read inside the write
+    transaction, so concurrent calls award at most once.
     """
-    # Import here to avoid circular dependency
-    from db.sunflowers import add_sunflowers, reset_streak_sunflowers
-    from db.pets import use_pet
-    from db.gardens import degrade_garden, destroy_garden
-    
-    today = date.today()
-    
+    from db.sunflowers import credit_many_in_transaction, read_totals_in_transaction
+
+    # Fast path: already counted today, no I/O
+    if _active_today.check(user_id):
+        return
+
+    today = date.today().isoformat()
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+
     async with await get_db() as db:
-        # Get current streak
-        cursor = await db.execute(
-            "SELECT current_days, last_active_date FROM streaks WHERE user_id = ?",
-            (user_id,)
-        )
-        row = await cursor.fetchone()
-        
+        row = await _get_streak_row(db, user_id)
+
+    if row and row['current_days'] > 0 and row['last_active_date'] and row['last_active_date'] < yesterday:
+        # Missed days the nightly job hasn't evaluated yet
+        await evaluate_broken_streaks(user_ids=[user_id])
+
+    new_days = None
+    totals = {}
+
+    async with transaction() as db:
+        row = await _get_streak_row(db, user_id)
+
         if not row:
             # First time - create streak
+            new_days = 1
             await db.execute(
                 "INSERT INTO streaks (user_id, current_days, last_active_date) VALUES (?, 1, ?)",
-                (user_id, today.isoformat())
+                (user_id, today)
             )
-            await db.commit()
-            return
-        
-        current_days = row['current_days']
-        last_active = row['last_active_date']
-        
-        if last_active:
-            last_date = date.fromisoformat(last_active)
-            days_diff = (today - last_date).days
-            
-            if days_diff == 0:
-                # Same day, no update
-                return
-            elif days_diff == 1:
-                # Continue streak
-                new_days = current_days + 1
-                
-                await db.execute(
-                    "UPDATE streaks SET current_days = ?, last_active_date = ? WHERE user_id = ?",
-                    (new_days, today.isoformat(), user_id)
-                )
-                await db.commit()
-                
-                # Award sunflowers if eligible
-                if new_days >= settings.STREAK_START_THRESHOLD:
-                    await _award_streak_sunflowers(user_id, new_days)
+        elif row['last_active_date'] != today:
+            resumed = False
+            if row['last_active_date'] == yesterday:
+                new_days = row['current_days'] + 1
             else:
-                # Streak broken - try to use pet
-                pet_used = await use_pet(user_id)
-                
-                if pet_used:
-                    # Pet saved streak
-                    await db.execute(
-                        "UPDATE streaks SET last_active_date = ? WHERE user_id = ?",
-                        (today.isoformat(), user_id)
-                    )
-                    await db.commit()
-                else:
-                    # Reset streak
-                    await db.execute(
-                        "UPDATE streaks SET current_days = 1, last_active_date = ? WHERE user_id = ?",
-                        (today.isoformat(), user_id)
-                    )
-                    await db.commit()
-                    
-                    # Remove streak sunflowers
-                    await reset_streak_sunflowers(user_id)
-                    
-                    # Destroy garden
-                    await destroy_garden(user_id)
-        else:
-            # No last_active, start fresh
+                cursor = await db.execute(
+                    "DELETE FROM streak_pet_saves WHERE user_id = ?",
+                    (user_id,)
+                )
+                # Pet-saved gap: the streak is held as it was
+                resumed = cursor.rowcount > 0
+                new_days = row['current_days'] if resumed else 1
+
             await db.execute(
-                "UPDATE streaks SET current_days = 1, last_active_date = ? WHERE user_id = ?",
-                (today.isoformat(), user_id)
+                "UPDATE streaks SET current_days = ?, last_active_date = ? WHERE user_id = ?",
+                (new_days, today, user_id)
             )
-            await db.commit()
 
+            # Award sunflowers if eligible (not for resuming a saved streak)
+            if not resumed and new_days >= settings.STREAK_START_THRESHOLD:
+                await credit_many_in_transaction(db, [(user_id, _streak_reward(new_days), 'streak')])
+                totals = await read_totals_in_transaction(db, [user_id])
 
-async def _award_streak_sunflowers(user_id: int, streak_days: int):
-    """Award sunflowers based on streak multiplier"""
-    from db.sunflowers import add_sunflowers
-    
-    multiplier = 1.0
-    
-    if streak_days >= 30:
-        multiplier = settings.STREAK_30D_MULTIPLIER
-    elif streak_days >= 7:
-        multiplier = settings.STREAK_7D_MULTIPLIER
-    
-    reward = int(settings.BASE_STREAK_REWARD * multiplier)
-    await add_sunflowers(user_id, reward, 'streak')
+    if new_days is not None:
+        boards['streaks'].update(user_id, new_days)
+        boards['sunflowers'].update_many(totals)
+    _active_today.add(user_id)
+
+
+async def evaluate_broken_streaks(
+    user_ids: Optional[List[int]] = None,
+    batch_size: int = 500
+) -> Tuple[int, int]:
+    """
+    Nightly job: find every live streak whose user missed yesterday and
+    settle it set-wise, batch_size users per transaction.
+    - users with a pet: oldest pet consumed, streak held until they are
+      back (recorded in streak_pet_saves, so later nights of the same gap
+      are skipped and cost no further pets)
+    - everyone else: streak reset, streak sunflowers clawed back, garden destroyed
+    Pass user_ids to evaluate only those users.
+    Returns (saved_by_pet, reset).
+    """
+    from db.pets import use_pets_in_transaction
+    from db.sunflowers import reset_streak_sunflowers_in_transaction, read_totals_in_transaction
+    from db.gardens import destroy_gardens_in_transaction
+
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    saved_total = 0
+    reset_total = 0
+
+    while True:
+        async with await get_db() as db:
+            if user_ids is None:
+                cursor = await db.execute(
+                    """
+                    SELECT user_id FROM streaks
+                    WHERE current_days > 0 AND last_active_date < ?
+                    AND user_id NOT IN (SELECT user_id FROM streak_pet_saves)
+                    LIMIT ?
+                    """,
+                    (yesterday, batch_size)
+                )
+            else:
+                placeholders = ", ".join("?" * len(user_ids))
+                cursor = await db.execute(
+                    f"""
+                    SELECT user_id FROM streaks
+                    WHERE current_days > 0 AND last_active_date < ?
+                    AND user_id NOT IN (SELECT user_id FROM streak_pet_saves)
+                    AND user_id IN ({placeholders})
+                    """,
+                    (yesterday, *user_ids)
+                )
+            batch = [row['user_id'] for row in await cursor.fetchall()]
+
+        if not batch:
+            break
+
+        async with transaction() as db:
+            saved = await use_pets_in_transaction(db, batch)
+            broken = [user_id for user_id in batch if user_id not in saved]
+
+            if saved:
+                await db.executemany(
+                    "INSERT OR IGNORE INTO streak_pet_saves (user_id) VALUES (?)",
+                    [(user_id,) for user_id in saved]
+                )
+
+            if broken:
+                placeholders = ", ".join("?" * len(broken))
+                await db.execute(
+                    f"UPDATE streaks SET current_days = 0 WHERE user_id IN ({placeholders})",
+                    broken
+                )
+                await reset_streak_sunflowers_in_transaction(db, broken)
+                await destroy_gardens_in_transaction(db, broken)
+                totals = await read_totals_in_transaction(db, broken)
+
+        for user_id in broken:
+            boards['streaks'].remove(user_id)
+        if broken:
+            boards['sunflowers'].update_many(totals)
+
+        saved_total += len(saved)
+        reset_total += len(broken)
+
+        if user_ids is not None or len(batch) < batch_size:
+            break
+
+    return saved_total, reset_total
 
 
 async def get_streak_days(user_id: int) -> int:
@@ -1,8 +1,120 @@
 """
-Sunflower ledger system - OWNS sunflower_ledger table
+Sunflower ledger system - OWNS sunflower_ledger, sunflower_balances and game_escrow tables
+Every ledger insert goes through _ledger_insert so both stay in step.
+Game bets are held in game_escrow from accept until the game ends: the
+stake leaves the balance as ordinary ledger debits, and release credits
+it to the winner or back to the sources it came from.
 """
-from typing import Dict
-from db.connection import get_db
+from typing import Dict, Iterable, List, Optional, Tuple
+from db.connection import get_db, transaction
+from db.leaderboards import boards, discard_snapshot_in_transaction, rebuild_sunflowers_board
+
+
+SOURCES = ('streak', 'game', 'gift', 'rating')
+
+
+async def _ledger_insert(db, user_id: int, source: str, amount: int):
+    """
+    Append a ledger entry and apply it to sunflower_balances.
+    Must run inside a transaction.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown sunflower source: {source}")
+    
+    await db.execute(
+        """
+        INSERT INTO sunflower_ledger (user_id, source, amount)
+        VALUES (?, ?, ?)
+        """,
+        (user_id, source, amount)
+    )
+    await db.execute(
+        f"""
+        INSERT INTO sunflower_balances (user_id, {source})
+        VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET {source} = {source} + excluded.{source}
+        """,
+        (user_id, amount)
+    )
+
+
+async def credit_many_in_transaction(db, credits: List[Tuple[int, int, str]]) -> int:
+    """
+    Credit many (user_id, amount, source) entries on a connection that is
+    already inside a transaction (caller owns BEGIN/COMMIT).
+    Ledger rows go in with one executemany; balance updates are summed per
+    (user, source) first. Non-positive amounts are skipped.
+    Returns number of ledger entries written.
+    """
+    entries = []
+    totals: Dict[Tuple[int, str], int] = {}
+    
+    for user_id, amount, source in credits:
+        if source not in SOURCES:
+            raise ValueError(f"Unknown sunflower source: {source}")
+        if amount <= 0:
+            continue
+        entries.append((user_id, source, amount))
+        totals[(user_id, source)] = totals.get((user_id, source), 0) + amount
+    
+    if not entries:
+        return 0
+    
+    await db.executemany(
+        """
+        INSERT INTO sunflower_ledger (user_id, source, amount)
+        VALUES (?, ?, ?)
+        """,
+        entries
+    )
+    
+    for source in SOURCES:
+        rows = [(user_id, amount) for (user_id, src), amount in totals.items() if src == source]
+        if rows:
+            await db.executemany(
+                f"""
+                INSERT INTO sunflower_balances (user_id, {source})
+                VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET {source} = {source} + excluded.{source}
+                """,
+                rows
+            )
+    
+    return len(entries)
+
+
+async def read_totals_in_transaction(db, user_ids: Iterable[int]) -> Dict[int, int]:
+    """Display totals (sources clamped at 0) for leaderboard updates"""
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return {}
+    
+    placeholders = ", ".join("?" * len(user_ids))
+    cursor = await db.execute(
+        f"""
+        SELECT user_id, MAX(0, streak) + MAX(0, game) + MAX(0, gift) + MAX(0, rating)
+        FROM sunflower_balances
+        WHERE user_id IN ({placeholders})
+        """,
+        user_ids
+    )
+    totals = {user_id: 0 for user_id in user_ids}
+    totals.update({row[0]: row[1] for row in await cursor.fetchall()})
+    return totals
+
+
+async def credit_many(credits: List[Tuple[int, int, str]]) -> int:
+    """
+    Batched payout: write any number of (user_id, amount, source) credits
+    and their balance updates in one transaction (one commit).
+    Returns number of ledger entries written.
+    """
+    async with transaction() as db:
+        written = await credit_many_in_transaction(db, credits)
+        totals = await read_totals_in_transaction(db, (user_id for user_id, _, _ in credits))
+    
+    boards['sunflowers'].update_many(totals)
+    return written
 
 
 async def add_sunflowers(user_id: int, amount: int, source: str):
@@ -13,15 +125,11 @@ async def add_sunflowers(user_id: int, amount: int, source: str):
     if amount <= 0:
         return
     
-    async with await get_db() as db:
-        await db.execute(
-            """
-            INSERT INTO sunflower_ledger (user_id, source, amount)
-            VALUES (?, ?, ?)
-            """,
-            (user_id, source, amount)
-        )
-        await db.commit()
+    async with transaction() as db:
+        await _ledger_insert(db, user_id, source, amount)
+        totals = await read_totals_in_transaction(db, [user_id])
+    
+    boards['sunflowers'].update_many(totals)
 
 
 async def remove_sunflowers(user_id: int, amount: int, source: str):
@@ -32,105 +140,335 @@ async def remove_sunflowers(user_id: int, amount: int, source: str):
     if amount <= 0:
         return 0
     
-    async with await get_db() as db:
-        await db.execute(
-            """
-            INSERT INTO sunflower_ledger (user_id, source, amount)
-            VALUES (?, ?, ?)
-            """,
-            (user_id, source, -amount)
-        )
-        await db.commit()
-        return amount
+    async with transaction() as db:
+        await _ledger_insert(db, user_id, source, -amount)
+        totals = await read_totals_in_transaction(db, [user_id])
+    
+    boards['sunflowers'].update_many(totals)
+    return amount
 
 
 async def get_sunflower_balance(user_id: int) -> Dict[str, int]:
     """
-    Get sunflower balance by source.
+    Get sunflower balance by source (single sunflower_balances lookup).
     Returns: {'streak': X, 'game': Y, 'gift': Z, 'rating': W, 'total': SUM}
     """
     async with await get_db() as db:
         cursor = await db.execute(
             """
-            SELECT source, SUM(amount)
-            FROM sunflower_ledger
+            SELECT streak, game, gift, rating
+            FROM sunflower_balances
             WHERE user_id = ?
-            GROUP BY source
             """,
             (user_id,)
         )
-        rows = await cursor.fetchall()
+        row = await cursor.fetchone()
         
         balance = {'streak': 0, 'game': 0, 'gift': 0, 'rating': 0}
         
-        for row in rows:
-            source = row[0]
-            amount = row[1]
-            if source in balance:
-                balance[source] = max(0, amount)  # Never negative display
+        if row:
+            for source in SOURCES:
+                balance[source] = max(0, row[source])  # Never negative display
         
         balance['total'] = sum(balance.values())
         return balance
 
 
-async def deduct_sunflowers_smart(user_id: int, amount: int) -> bool:
+async def _read_balance(db, user_id: int) -> Dict[str, int]:
+    """Per-source balance (clamped at 0) read on the caller's connection"""
+    cursor = await db.execute(
+        "SELECT streak, game, gift, rating FROM sunflower_balances WHERE user_id = ?",
+        (user_id,)
+    )
+    row = await cursor.fetchone()
+    return {source: max(0, row[source]) if row else 0 for source in SOURCES}
+
+
+DEDUCTION_PRIORITY = ('game', 'gift', 'rating', 'streak')
+
+
+async def deduct_sunflowers_in_transaction(db, user_id: int, amount: int) -> Optional[Dict[str, int]]:
     """
-    Deduct sunflowers with priority: game > gift > rating > streak.
-    Returns True if successful, False if insufficient balance.
+    Smart deduction on a connection that is already inside a transaction.
+    Returns {source: amount_deducted}, or None if insufficient balance.
     """
-    balance = await get_sunflower_balance(user_id)
+    balance = await _read_balance(db, user_id)
     
-    if balance['total'] < amount:
-        return False
+    if sum(balance.values()) < amount:
+        return None
     
+    breakdown = {}
     remaining = amount
     
+    for source in DEDUCTION_PRIORITY:
+        if remaining <= 0:
+            break
+        
+        deduct = min(balance[source], remaining)
+        if deduct > 0:
+            await _ledger_insert(db, user_id, source, -deduct)
+            breakdown[source] = deduct
+            remaining -= deduct
+    
+    return breakdown
+
+
+async def deduct_sunflowers_smart(user_id: int, amount: int) -> Optional[Dict[str, int]]:
+    """
+    Deduct sunflowers with priority: game > gift > rating > streak.
+    The balance is read inside the same BEGIN IMMEDIATE as the debits, so two
+    concurrent deductions can never both spend the same sunflowers.
+    Returns {source: amount_deducted}, or None if insufficient balance.
+    """
+    async with transaction() as db:
+        breakdown = await deduct_sunflowers_in_transaction(db, user_id, amount)
+        totals = await read_totals_in_transaction(db, [user_id]) if breakdown is not None else {}
+    
+    boards['sunflowers'].update_many(totals)
+    return breakdown
+
+
+# ============ GAME ESCROW ============
+async def short_stake_in_transaction(db, stakes: List[Tuple[int, int]]) -> Optional[int]:
+    """First user_id whose balance can't cover their (user_id, amount) stake, or None"""
+    for user_id, amount in stakes:
+        if amount > 0 and sum((await _read_balance(db, user_id)).values()) < amount:
+            return user_id
+    return None
+
+
+async def hold_stakes_in_transaction(db, game_id: int, stakes: List[Tuple[int, int]]):
+    """
+    Move (user_id, amount) stakes from balances into game_escrow
+    (caller owns the transaction and checked short_stake_in_transaction).
+    """
+    rows = []
+    for user_id, amount in stakes:
+        if amount <= 0:
+            continue
+        breakdown = await deduct_sunflowers_in_transaction(db, user_id, amount)
+        rows += [(game_id, user_id, source, held) for source, held in breakdown.items()]
+    
+    await db.executemany(
+        """
+        INSERT INTO game_escrow (game_id, user_id, source, amount)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(game_id, user_id, source) DO UPDATE SET amount = amount + excluded.amount
+        """,
+        rows
+    )
+
+
+async def release_escrow_in_transaction(
+    db,
+    game_id: int,
+    winner_id: Optional[int],
+    bonus: int = 0
+) -> int:
+    """
+    Pay out a game's held stakes (caller owns the transaction): all of them
+    plus bonus to winner_id as 'game' sunflowers, or each back to its
+    original source when winner_id is None. Returns the amount that was held.
+    """
+    cursor = await db.execute(
+        "SELECT user_id, source, amount FROM game_escrow WHERE game_id = ?",
+        (game_id,)
+    )
+    held = [(row['user_id'], row['amount'], row['source']) for row in await cursor.fetchall()]
+    
+    if held:
+        await db.execute("DELETE FROM game_escrow WHERE game_id = ?", (game_id,))
+    
+    total = sum(amount for _, amount, _ in held)
+    if winner_id is None:
+        await credit_many_in_transaction(db, held)
+    else:
+        await credit_many_in_transaction(db, [(winner_id, total + bonus, 'game')])
+    
+    return total
+
+
+async def reset_streak_sunflowers_in_transaction(db, user_ids: List[int]):
+    """
+    Claw back all streak sunflowers for many users set-wise
+    (caller owns the transaction).
+    """
+    if not user_ids:
+        return
+    
+    placeholders = ", ".join("?" * len(user_ids))
+    await db.execute(
+        f"""
+        INSERT INTO sunflower_ledger (user_id, source, amount)
+        SELECT user_id, 'streak', -streak
+        FROM sunflower_balances
+        WHERE user_id IN ({placeholders}) AND streak > 0
+        """,
+        user_ids
+    )
+    await db.execute(
+        f"UPDATE sunflower_balances SET streak = 0 WHERE user_id IN ({placeholders}) AND streak > 0",
+        user_ids
+    )
+
+
+async def get_ledger_balances() -> Dict[int, Dict[str, int]]:
+    """Recompute every user's per-source sums from checkpoints + ledger tail (audit)"""
     async with await get_db() as db:
-        async with db.execute("BEGIN"):
-            # Deduct from game first
-            if balance['game'] > 0:
-                deduct = min(balance['game'], remaining)
-                await db.execute(
-                    "INSERT INTO sunflower_ledger (user_id, source, amount) VALUES (?, 'game', ?)",
-                    (user_id, -deduct)
-                )
-                remaining -= deduct
+        cursor = await db.execute(
+            """
+            SELECT user_id, source, SUM(amount)
+            FROM (
+                SELECT user_id, source, amount FROM sunflower_checkpoints
+                UNION ALL
+                SELECT user_id, source, amount FROM sunflower_ledger
+            )
+            GROUP BY user_id, source
+            """
+        )
+        
+        sums: Dict[int, Dict[str, int]] = {}
+        while True:
+            rows = await cursor.fetchmany(5000)
+            if not rows:
+                break
+            for user_id, source, amount in rows:
+                sums.setdefault(user_id, dict.fromkeys(SOURCES, 0))[source] = amount
+        
+        return sums
+
+
+async def get_materialized_balances() -> Dict[int, Dict[str, int]]:
+    """Get every row of sunflower_balances"""
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT user_id, streak, game, gift, rating FROM sunflower_balances"
+        )
+        rows = await cursor.fetchall()
+        return {row['user_id']: {source: row[source] for source in SOURCES} for row in rows}
+
+
+async def rebuild_sunflower_balances() -> int:
+    """
+    Rewrite sunflower_balances from checkpoints + ledger in one transaction.
+    Returns number of users written.
+    """
+    async with transaction() as db:
+        await db.execute("DELETE FROM sunflower_balances")
+        cursor = await db.execute(
+            """
+            INSERT INTO sunflower_balances (user_id, streak, game, gift, rating)
+            SELECT user_id,
+                   SUM(CASE WHEN source = 'streak' THEN amount ELSE 0 END),
+                   SUM(CASE WHEN source = 'game' THEN amount ELSE 0 END),
+                   SUM(CASE WHEN source = 'gift' THEN amount ELSE 0 END),
+                   SUM(CASE WHEN source = 'rating' THEN amount ELSE 0 END)
+            FROM (
+                SELECT user_id, source, amount FROM sunflower_checkpoints
+                UNION ALL
+                SELECT user_id, source, amount FROM sunflower_ledger
+            )
+            GROUP BY user_id
+            """
+        )
+        written = cursor.rowcount
+        await discard_snapshot_in_transaction(db, 'sunflowers')
+    
+    await rebuild_sunflowers_board()
+    return written
+
+
+# ============ LEDGER COMPACTION ============
+async def checkpoint_ledger(horizon_days: int, batch_users: int) -> Tuple[int, int]:
+    """
+    Fold ledger entries older than horizon_days into per-(user, source)
+    checkpoint rows and move the folded entries to sunflower_ledger_archive.
+    Works through users in batches of batch_users, one transaction each.
+    Returns (users_checkpointed, entries_archived).
+    """
+    users_done = 0
+    archived = 0
+    
+    async with await get_db() as db:
+        # Ledger is append-only, so rowid order is time order
+        cursor = await db.execute(
+            "SELECT MAX(rowid) FROM sunflower_ledger WHERE created_at <= datetime('now', ?)",
+            (f"-{horizon_days} days",)
+        )
+        through_rowid = (await cursor.fetchone())[0]
+        
+        if through_rowid is None:
+            return 0, 0
+        
+        while True:
+            cursor = await db.execute(
+                """
+                SELECT DISTINCT user_id FROM sunflower_ledger
+                WHERE rowid <= ?
+                LIMIT ?
+                """,
+                (through_rowid, batch_users)
+            )
+            user_ids = [row[0] for row in await cursor.fetchall()]
             
-            # Then gift
-            if remaining > 0 and balance['gift'] > 0:
-                deduct = min(balance['gift'], remaining)
-                await db.execute(
-                    "INSERT INTO sunflower_ledger (user_id, source, amount) VALUES (?, 'gift', ?)",
-                    (user_id, -deduct)
-                )
-                remaining -= deduct
+            if not user_ids:
+                break
             
-            # Then rating
-            if remaining > 0 and balance['rating'] > 0:
-                deduct = min(balance['rating'], remaining)
-                await db.execute(
-                    "INSERT INTO sunflower_ledger (user_id, source, amount) VALUES (?, 'rating', ?)",
-                    (user_id, -deduct)
-                )
-                remaining -= deduct
+            placeholders = ", ".join("?" * len(user_ids))
+            scope = f"rowid <= ? AND user_id IN ({placeholders})"
+            params = (through_rowid, *user_ids)
             
-            # Finally streak
-            if remaining > 0 and balance['streak'] > 0:
-                deduct = min(balance['streak'], remaining)
-                await db.execute(
-                    "INSERT INTO sunflower_ledger (user_id, source, amount) VALUES (?, 'streak', ?)",
-                    (user_id, -deduct)
+            async with transaction() as tx:
+                await tx.execute(
+                    f"""
+                    INSERT INTO sunflower_checkpoints (user_id, source, amount, through_rowid)
+                    SELECT user_id, source, SUM(amount), ?
+                    FROM sunflower_ledger
+                    WHERE {scope}
+                    GROUP BY user_id, source
+                    ON CONFLICT(user_id, source) DO UPDATE SET
+                        amount = amount + excluded.amount,
+                        through_rowid = excluded.through_rowid,
+                        updated_at = CURRENT_TIMESTAMP
+                    """,
+                    (through_rowid, *params)
+                )
+                await tx.execute(
+                    f"INSERT INTO sunflower_ledger_archive SELECT * FROM sunflower_ledger WHERE {scope}",
+                    params
                 )
-                remaining -= deduct
+                cursor = await tx.execute(
+                    f"DELETE FROM sunflower_ledger WHERE {scope}",
+                    params
+                )
+                archived += cursor.rowcount
             
-            await db.commit()
+            users_done += len(user_ids)
     
-    return True
+    return users_done, archived
 
 
-async def reset_streak_sunflowers(user_id: int):
-    """Remove all streak-sourced sunflowers (on streak break)"""
-    balance = await get_sunflower_balance(user_id)
-    
-    if balance['streak'] > 0:
-        await remove_sunflowers(user_id, balance['streak'], 'streak')
+async def verify_checkpoints() -> List[Tuple[int, str, int, int]]:
+    """
+    Prove checkpoint + tail == full history for every (user, source).
+    The tail is shared by both sides, so this checks each checkpoint against
+    the sum of its archived entries.
+    Returns mismatches as (user_id, source, checkpoint_amount, archived_sum).
+    """
+    async with await get_db() as db:
+        cursor = await db.execute(
+            """
+            SELECT user_id, source, SUM(checkpoint), SUM(archived)
+            FROM (
+                SELECT user_id, source, amount AS checkpoint, 0 AS archived
+                FROM sunflower_checkpoints
+                UNION ALL
+                SELECT user_id, source, 0, amount
+                FROM sunflower_ledger_archive
+            )
+            GROUP BY user_id, source
+            HAVING SUM(checkpoint) != SUM(archived)
+            """
+        )
+        rows = await cursor.fetchall()
+        return [(row[0], row[1], row[2], row[3]) for row in rows]
@@ -1,10 +1,12 @@
 """
 User state management - OWNS users table EXCLUSIVELY
 No other file touches users table
+Premium expiry times are mirrored in memory (_premium_until, loaded at
+startup and updated by every premium write) for per-message checks.
 """
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime, timedelta
-from db.connection import get_db
+from db.connection import get_db, transaction
 
 
 class UserState:
@@ -30,7 +32,7 @@ async def user_exists(user_id: int) -> bool:
 
 async def create_user(user_id: int, gender: str):
     """Create new user in NEW state"""
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             """
             INSERT INTO users (user_id, gender, current_state)
@@ -38,7 +40,6 @@ async def create_user(user_id: int, gender: str):
             """,
             (user_id, gender, UserState.NEW)
         )
-        await db.commit()
 
 
 async def get_user_state(user_id: int) -> Optional[str]:
@@ -57,7 +58,7 @@ async def transition_state(user_id: int, from_state: str, to_state: str) -> bool
     Atomic state transition with validation.
     Returns True if transition succeeded, False if user was not in from_state.
     """
-    async with await get_db() as db:
+    async with transaction() as db:
         cursor = await db.execute(
             """
             UPDATE users
@@ -66,18 +67,16 @@ async def transition_state(user_id: int, from_state: str, to_state: str) -> bool
             """,
             (to_state, user_id, from_state)
         )
-        await db.commit()
         return cursor.rowcount > 0
 
 
 async def force_set_state(user_id: int, state: str):
     """Force set state (use with extreme caution)"""
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             "UPDATE users SET current_state = ?, last_active = CURRENT_TIMESTAMP WHERE user_id = ?",
             (state, user_id)
         )
-        await db.commit()
 
 
 async def get_user(user_id: int) -> Optional[dict]:
@@ -104,12 +103,11 @@ async def get_partner_id(user_id: int) -> Optional[int]:
 
 async def set_partner(user_id: int, partner_id: Optional[int]):
     """Set user's partner (used by matchmaking.py ONLY)"""
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             "UPDATE users SET partner_id = ? WHERE user_id = ?",
             (partner_id, user_id)
         )
-        await db.commit()
 
 
 async def is_premium(user_id: int) -> bool:
@@ -128,16 +126,44 @@ async def is_premium(user_id: int) -> bool:
         return False
 
 
+_premium_until: Dict[int, datetime] = {}
+
+
+async def load_premium_cache() -> int:
+    """Startup: mirror every unexpired premium_until into memory. Returns count."""
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT user_id, premium_until FROM users WHERE premium_until IS NOT NULL"
+        )
+        rows = await cursor.fetchall()
+    
+    now = datetime.now()
+    _premium_until.clear()
+    for row in rows:
+        premium_until = datetime.fromisoformat(row['premium_until'])
+        if premium_until > now:
+            _premium_until[row['user_id']] = premium_until
+    
+    return len(_premium_until)
+
+
+def is_premium_cached(user_id: int) -> bool:
+    """is_premium from the in-memory mirror (no I/O)"""
+    premium_until = _premium_until.get(user_id)
+    return premium_until is not None and premium_until > datetime.now()
+
+
 async def update_premium(user_id: int, days: int):
     """Add premium days to user"""
     premium_until = datetime.now() + timedelta(days=days)
     
-    async with await get_db() as db:
+    async with transaction() as db:
         await db.execute(
             "UPDATE users SET premium_until = ? WHERE user_id = ?",
             (premium_until.isoformat(), user_id)
         )
-        await db.commit()
+    
+    _premium_until[user_id] = premium_until
 
 
 async def get_premium_days_remaining(user_id: int) -> int:
@@ -191,7 +217,7 @@ async def use_temp_premium(user_id: int):
     """Mark temp premium as used and activate premium"""
     from config import settings
     
-    async with await get_db() as db:
+    async with transaction() as db:
         premium_until = datetime.now() + timedelta(days=settings.TEMP_PREMIUM_DAYS)
         
         await db.execute(
@@ -203,4 +229,5 @@ async def use_temp_premium(user_id: int):
             """,
             (premium_until.isoformat(), user_id)
         )
-        await db.commit()
+    
+    _premium_until[user_id] = premium_until
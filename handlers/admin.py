@@ -10,6 +10,8 @@ from config import settings
 from db.moderation import (
     get_bot_stats, get_recent_messages, ban_user, unban_user, get_all_user_ids
 )
+from db.streaks import get_activity_cache_stats
+from handlers.keyboards import get_keyboard_cache_stats
 
 router = Router()
 
@@ -44,6 +46,8 @@ async def admin_stats(callback: CallbackQuery):
         return
     
     stats = await get_bot_stats()
+    streak_cache = get_activity_cache_stats()
+    keyboard_cache = get_keyboard_cache_stats()
     
     text = (
         f"📊 Bot Statistics\n\n"
@@ -52,7 +56,11 @@ async def admin_stats(callback: CallbackQuery):
         f"💬 Active Chats: {stats['active_chats']}\n"
         f"🔍 Searching: {stats['searching']}\n"
         f"⭐ Total Ratings: {stats['total_ratings']}\n"
-        f"🚫 Banned Users: {stats['banned_users']}"
+        f"🚫 Banned Users: {stats['banned_users']}\n"
+        f"🔥 Active Today (cached): {streak_cache['users_today']} "
+        f"({streak_cache['hit_rate']:.0%} hit rate)\n"
+        f"⌨️ Keyboard Cache: {keyboard_cache['size']} "
+        f"({keyboard_cache['hit_rate']:.0%} hit rate)"
     )
     
     await callback.message.edit_text(text)
@@ -91,6 +99,51 @@ async def admin_messages(callback: CallbackQuery):
     await callback.answer()
 
 
+@router.message(Command("lookup"))
+async def cmd_lookup(message: Message):
+    """Search a user's monitored messages (live partitions + archive)"""
+    if not is_admin(message.from_user.id):
+        return
+    
+    from db.moderation import search_live_messages
+    from services.archiver import search_archive
+    
+    parts = message.text.split()
+    if len(parts) < 2:
+        await message.answer("Usage: /lookup <user_id>")
+        return
+    
+    try:
+        user_id = int(parts[1])
+    except ValueError:
+        await message.answer("Invalid user ID.")
+        return
+    
+    messages = await search_live_messages(user_id, 20)
+    if len(messages) < 20:
+        messages += await search_archive(user_id, 20 - len(messages))
+    
+    if not messages:
+        await message.answer(f"No messages found for user {user_id}.")
+        return
+    
+    text = f"🔎 Messages from {user_id}\n\n"
+    
+    for msg in messages:
+        timestamp = msg['sent_at'][:19] if msg['sent_at'] else "unknown"
+        
+        if msg['message_type'] == 'text':
+            content = msg['content'][:50] + "..." if msg['content'] and len(msg['content']) > 50 else msg['content']
+            text += f"Chat {msg['chat_id']} ({timestamp}):\n{content}\n\n"
+        else:
+            text += f"Chat {msg['chat_id']} ({timestamp}): [{msg['message_type']}]\n\n"
+        
+        if len(text) > 3000:
+            break
+    
+    await message.answer(text)
+
+
 @router.message(Command("ban"))
 async def cmd_ban(message: Message):
     """Ban a user"""
@@ -0,0 +1,93 @@
+"""
+Chat relay handler - NO SQL, uses db modules and services
+Must be registered LAST: it catches every message no other router handled.
+"""
+from typing import Optional
+
+from aiogram import Router
+from aiogram.types import Message
+
+from config import settings
+from db.users import get_user_state, get_partner_id, is_premium_cached, UserState
+from db.matchmaking import get_chat_id
+from db.moderation import log_monitored_message
+from services.link_filter import count_links, allow_links, daily_link_limit, spam_detector
+from services.content_filter import content_filter
+from services.auto_ban import violation_tracker
+from handlers.games import handle_game_message
+
+router = Router()
+
+
+def _media_file_id(message: Message) -> Optional[str]:
+    """File id of the message's media, if any"""
+    if message.photo:
+        return message.photo[-1].file_id
+
+    media = getattr(message, message.content_type, None)
+    return getattr(media, 'file_id', None)
+
+
+async def _record_violation(message: Message, violation_type: str):
+    """Record a violation and tell the user if it got them banned"""
+    if await violation_tracker.record(message.from_user.id, violation_type):
+        await message.answer(
+            f"🚫 You have been banned for {settings.AUTO_BAN_HOURS} hours.\n\n"
+            f"Reason: repeated {violation_type} violations"
+        )
+
+
+@router.message()
+async def relay_message(message: Message):
+    """Relay a message to the sender's chat partner"""
+    user_id = message.from_user.id
+
+    # Word Chain / Hangman moves (in-memory check, no SQL for ordinary chat)
+    if await handle_game_message(message):
+        return
+
+    if await get_user_state(user_id) != UserState.CHATTING:
+        return
+
+    partner_id = await get_partner_id(user_id)
+    if not partner_id:
+        return
+
+    text = message.text or message.caption
+
+    # Banned-phrase stage
+    if content_filter.check(text):
+        await message.answer("🚫 Your message contains banned content and was not sent.")
+        await _record_violation(message, 'banned_phrase')
+        return
+
+    # Spam stage (flooding / repeating the same message): one violation per run
+    spam, first = spam_detector.check(user_id, text)
+    if spam:
+        if first:
+            await message.answer("🚫 Slow down - too many (or identical) messages. They are not being sent.")
+            await _record_violation(message, 'spam')
+        return
+
+    # Link stage: over the daily allowance is a rejected message, not a violation
+    links = count_links(text)
+    if links:
+        user_is_premium = is_premium_cached(user_id)
+        if not allow_links(user_id, links, user_is_premium):
+            limit = daily_link_limit(user_is_premium)
+            if limit:
+                await message.answer(f"🔗 Daily link limit reached ({limit}/day). Message not sent.")
+            else:
+                await message.answer("🔗 Sharing links is a Premium feature. Message not sent.")
+            return
+
+    await message.copy_to(partner_id)
+
+    chat_id = await get_chat_id(user_id)
+    await log_monitored_message(
+        chat_id,
+        user_id,
+        message.content_type,
+        text,
+        _media_file_id(message)
+    )
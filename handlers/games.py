@@ -1,6 +1,9 @@
 """
 Game handlers - NO SQL, uses db.games and services.game_engine
 """
+import asyncio
+from typing import Optional
+
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
@@ -8,12 +11,14 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from db.users import get_partner_id, is_premium
 from db.matchmaking import get_chat_id
-from db.games import create_game, get_active_game, update_game_state, end_game
-from db.sunflowers import get_sunflower_balance, add_sunflowers, deduct_sunflowers_smart
+from db.games import create_game, get_active_game, update_game_state, settle_game, get_player_game
+from db.sunflowers import get_sunflower_balance
 from services.game_engine import (
     create_tictactoe_state, make_tictactoe_move, check_tictactoe_winner,
-    create_wordchain_state, create_hangman_state, get_next_player
+    create_wordchain_state, make_wordchain_move, create_hangman_state,
+    make_hangman_guess, format_hangman_word, get_next_player
 )
+from handlers.keyboards import tictactoe_keyboard, game_menu_keyboard, bet_menu_keyboard
 from config import settings
 
 router = Router()
@@ -45,17 +50,9 @@ async def cmd_game(message: Message):
         await message.answer("A game is already in progress!")
         return
     
-    # Show game menu
-    builder = InlineKeyboardBuilder()
-    builder.button(text="🎯 Tic Tac Toe", callback_data="game_menu:tictactoe")
-    builder.button(text="📝 Word Chain (Easy)", callback_data="game_menu:wordchain_easy")
-    builder.button(text="📝 Word Chain (Hard)", callback_data="game_menu:wordchain_hard")
-    builder.button(text="🔤 Hangman", callback_data="game_menu:hangman")
-    builder.adjust(1)
-    
     await message.answer(
         "🎮 Choose a game to play:",
-        reply_markup=builder.as_markup()
+        reply_markup=game_menu_keyboard()
     )
 
 
@@ -64,17 +61,9 @@ async def game_menu_callback(callback: CallbackQuery):
     """Handle game selection"""
     game_type = callback.data.split(":")[1]
     
-    # Show bet options
-    builder = InlineKeyboardBuilder()
-    builder.button(text="No bet", callback_data=f"game_bet:{game_type}:0")
-    builder.button(text="50 🌻", callback_data=f"game_bet:{game_type}:50")
-    builder.button(text="100 🌻", callback_data=f"game_bet:{game_type}:100")
-    builder.button(text="200 🌻", callback_data=f"game_bet:{game_type}:200")
-    builder.adjust(2)
-    
     await callback.message.edit_text(
         "Choose bet amount:",
-        reply_markup=builder.as_markup()
+        reply_markup=bet_menu_keyboard(game_type)
     )
     await callback.answer()
 
@@ -140,16 +129,6 @@ async def game_accept_callback(callback: CallbackQuery):
         await callback.answer("You're no longer in chat with this user.", show_alert=True)
         return
     
-    # Check sunflowers
-    if bet_amount > 0:
-        balance = await get_sunflower_balance(accepter_id)
-        if balance['total'] < bet_amount:
-            await callback.answer(
-                f"You don't have enough sunflowers! Need {bet_amount}",
-                show_alert=True
-            )
-            return
-    
     # Create game
     chat_id = await get_chat_id(accepter_id)
     
@@ -160,9 +139,20 @@ async def game_accept_callback(callback: CallbackQuery):
         difficulty = 'easy' if game_type == 'wordchain_easy' else 'hard'
         initial_state = create_wordchain_state(difficulty)
     elif game_type == 'hangman':
-        initial_state = create_hangman_state()
+        initial_state = create_hangman_state(chat_id)
     
+    # Both bets go into escrow with the game; nothing is created if the chat
+    # already has a game (second Accept click) or either player can't pay
     game_id = await create_game(chat_id, game_type, inviter_id, accepter_id, bet_amount, initial_state)
+    if game_id is None:
+        if await get_active_game(chat_id):
+            await callback.answer("A game is already in progress!", show_alert=True)
+        else:
+            await callback.answer(
+                f"Both players need {bet_amount} 🌻 to start this game!",
+                show_alert=True
+            )
+        return
     
     await callback.message.edit_text("✅ Game accepted! Starting...")
     
@@ -205,15 +195,8 @@ async def start_tictactoe(bot, game_id: int, player1_id: int, player2_id: int):
 
 
 def create_tictactoe_keyboard(game_id: int, board: list):
-    """Create tic tac toe inline keyboard"""
-    builder = InlineKeyboardBuilder()
-    
-    for i in range(9):
-        text = board[i] if board[i] else str(i+1)
-        builder.button(text=text, callback_data=f"ttt:{game_id}:{i}")
-    
-    builder.adjust(3)
-    return builder.as_markup()
+    """Create tic tac toe inline keyboard (memoized per game and position)"""
+    return tictactoe_keyboard(game_id, board)
 
 
 @router.callback_query(F.data.startswith("ttt:"))
@@ -229,7 +212,7 @@ async def tictactoe_move_callback(callback: CallbackQuery):
     
     game = await get_game_by_id(game_id)
     
-    if not game or game['winner_id'] is not None:
+    if not game or game['ended'] or game['winner_id'] is not None:
         await callback.answer("Game is over!", show_alert=True)
         return
     
@@ -247,34 +230,32 @@ async def tictactoe_move_callback(callback: CallbackQuery):
         await callback.answer("Position taken!", show_alert=True)
         return
     
-    # Update state
-    next_turn = get_next_player(user_id, game['player1_id'], game['player2_id'])
-    await update_game_state(game_id, game['state'], next_turn)
-    
-    board_markup = create_tictactoe_keyboard(game_id, game['state']['board'])
-    
-    if winner:
-        # Game over
-        if winner == 'draw':
-            await end_game(game_id, None)
-            await callback.bot.send_message(game['player1_id'], "🎯 Draw!")
-            await callback.bot.send_message(game['player2_id'], "🎯 Draw!")
-        else:
-            winner_id = game['player1_id'] if winner == 'X' else game['player2_id']
-            loser_id = game['player2_id'] if winner == 'X' else game['player1_id']
-            
-            await end_game(game_id, winner_id)
-            await award_game_winnings(winner_id, loser_id, game['bet_amount'])
-            
-            total_pot = game['bet_amount'] * 2 + settings.GAME_BASE_REWARD
-            await callback.bot.send_message(winner_id, f"🎉 You won! +{total_pot} 🌻")
-            await callback.bot.send_message(loser_id, f"😔 You lost. -{game['bet_amount']} 🌻")
-        
-        await callback.message.edit_reply_markup(reply_markup=None)
-    else:
+    if not winner:
         # Continue
+        next_turn = get_next_player(user_id, game['player1_id'], game['player2_id'])
+        await update_game_state(game_id, game['state'], next_turn)
+        
+        board_markup = create_tictactoe_keyboard(game_id, game['state']['board'])
         await callback.message.edit_reply_markup(reply_markup=board_markup)
+        await callback.answer()
+        return
     
+    # Game over
+    if winner == 'draw':
+        if await settle_game(game_id, None) is not None:
+            await _notify(callback.bot, [
+                (game['player1_id'], "🎯 Draw!"),
+                (game['player2_id'], "🎯 Draw!"),
+            ])
+    else:
+        winner_id = game['player1_id'] if winner == 'X' else game['player2_id']
+        loser_id = game['player2_id'] if winner == 'X' else game['player1_id']
+        
+        totals = await settle_game(game_id, winner_id)
+        if totals is not None:
+            await _notify(callback.bot, _result_messages(game, winner_id, loser_id, totals))
+    
+    await callback.message.edit_reply_markup(reply_markup=None)
     await callback.answer()
 
 
@@ -297,24 +278,125 @@ async def start_wordchain(bot, player1_id: int, player2_id: int, state: dict):
 # ============ HANGMAN ============
 async def start_hangman(bot, player1_id: int, player2_id: int, state: dict):
     """Start hangman game"""
-    from services.game_engine import format_hangman_word
-    
     display = format_hangman_word(state)
     
-    msg_text = f"🔤 Hangman started!\n\nWord: {display}\nWrong guesses: 0/{state['max_wrong']}\n\nGuess a letter!"
+    msg_text = f"🔤 Hangman started!\n\nWord: {display}\nWrong guesses: 0/{state['max_wrong']}\n\n"
     
-    await bot.send_message(player1_id, msg_text)
-    await bot.send_message(player2_id, msg_text)
+    await bot.send_message(player1_id, msg_text + "Your turn! Guess a letter.")
+    await bot.send_message(player2_id, msg_text + "Waiting for partner...")
 
 
-# ============ GAME REWARDS ============
-async def award_game_winnings(winner_id: int, loser_id: int, bet_amount: int):
-    """Award game winnings"""
-    total_pot = bet_amount * 2 + settings.GAME_BASE_REWARD
+# ============ TEXT MOVES (Word Chain / Hangman) ============
+def _parse_text_move(game: dict, text: Optional[str]) -> Optional[str]:
+    """The move a message represents for this game, or None if it's ordinary chat"""
+    if not text:
+        return None
     
-    # Award winner
-    await add_sunflowers(winner_id, total_pot, 'game')
+    candidate = text.strip().lower()
     
-    # Deduct from loser
-    if bet_amount > 0:
-        await deduct_sunflowers_smart(loser_id, bet_amount)
+    if game['game_type'] == 'hangman':
+        return candidate if len(candidate) == 1 and 'a' <= candidate <= 'z' else None
+    
+    if game['game_type'].startswith('wordchain'):
+        return candidate if candidate.isalpha() and ' ' not in candidate else None
+    
+    return None
+
+
+async def _notify(bot, messages):
+    """Send (chat_id, text) pairs concurrently"""
+    await asyncio.gather(*(bot.send_message(chat_id, text) for chat_id, text in messages))
+
+
+async def handle_game_message(message: Message) -> bool:
+    """
+    Route a chat message to the sender's Word Chain / Hangman game.
+    Decided from the in-memory session index (no SQL for ordinary chat).
+    Returns True if the message was consumed as a move.
+    """
+    user_id = message.from_user.id
+    game = get_player_game(user_id)
+    
+    if game is None or game['current_turn'] != user_id:
+        return False
+    
+    move = _parse_text_move(game, message.text)
+    if move is None:
+        return False
+    
+    if game['game_type'] == 'hangman':
+        await _hangman_move(message, game, move)
+    else:
+        await _wordchain_move(message, game, move)
+    return True
+
+
+async def _wordchain_move(message: Message, game: dict, word: str):
+    user_id = message.from_user.id
+    state = game['state']
+    
+    from services.content_filter import content_filter
+    
+    if content_filter.check(word):
+        await message.answer("🚫 That word isn't allowed. Try another!")
+        return
+    
+    valid, error, last_letter = make_wordchain_move(state, word)
+    if not valid:
+        await message.answer(f"❌ {error}. Try again!")
+        return
+    
+    partner_id = get_next_player(user_id, game['player1_id'], game['player2_id'])
+    await update_game_state(game['game_id'], state, partner_id)
+    
+    await _notify(message.bot, [
+        (user_id, f"✅ {word}\n\nWaiting for partner..."),
+        (partner_id, f"📝 Partner played: {word}\n\nYour turn! Send a word starting with '{last_letter}'"),
+    ])
+
+
+async def _hangman_move(message: Message, game: dict, letter: str):
+    user_id = message.from_user.id
+    state = game['state']
+    
+    valid, game_over, result = make_hangman_guess(state, letter)
+    if not valid:
+        await message.answer(f"'{letter}' was already guessed. Try another letter!")
+        return
+    
+    partner_id = get_next_player(user_id, game['player1_id'], game['player2_id'])
+    progress = (
+        f"Word: {format_hangman_word(state)}\n"
+        f"Wrong guesses: {state['wrong_guesses']}/{state['max_wrong']}"
+    )
+    
+    if not game_over:
+        await update_game_state(game['game_id'], state, partner_id)
+        await _notify(message.bot, [
+            (user_id, f"🔤 You guessed '{letter}'\n\n{progress}\n\nWaiting for partner..."),
+            (partner_id, f"🔤 Partner guessed '{letter}'\n\n{progress}\n\nYour turn! Guess a letter."),
+        ])
+        return
+    
+    # Completing the word wins; the guess that hangs the man loses
+    winner_id, loser_id = (user_id, partner_id) if result == 'won' else (partner_id, user_id)
+    
+    totals = await settle_game(game['game_id'], winner_id)
+    if totals is None:
+        return
+    
+    summary = f"🔤 The word was: {state['word']}\n\n"
+    await _notify(message.bot, [
+        (chat_id, summary + text)
+        for chat_id, text in _result_messages(game, winner_id, loser_id, totals)
+    ])
+
+
+# ============ GAME REWARDS ============
+def _result_messages(game: dict, winner_id: int, loser_id: int, totals: dict) -> list:
+    """(chat_id, text) result notices with the balances settle_game returned"""
+    total_pot = game['bet_amount'] * 2 + settings.GAME_BASE_REWARD
+    return [
+        (winner_id, f"🎉 You won! +{total_pot} 🌻\nBalance: {totals[winner_id]} 🌻"),
+        (loser_id, f"😔 You lost. -{game['bet_amount']} 🌻\nBalance: {totals[loser_id]} 🌻"),
+    ]
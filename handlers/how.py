@@ -91,6 +91,59 @@ async def cmd_stats(message: Message):
     await message.answer(text)
 
 
+_TOP_TITLES = {
+    'streaks': ("🔥 Top Streaks", "{:.0f} days"),
+    'sunflowers': ("🌻 Top Sunflowers", "{:.0f} 🌻"),
+    'ratings': ("⭐ Top Rated", "{:.2f} ⭐"),
+}
+
+
+@router.message(Command("top"))
+async def cmd_top(message: Message):
+    """
+    Leaderboard page: /top [streaks|sunflowers|ratings] [page]
+    Served from the in-memory boards (no SQL)
+    """
+    from config import settings
+    from db.leaderboards import boards
+    
+    args = message.text.split()[1:]
+    metric = args[0].lower() if args else 'sunflowers'
+    
+    if metric not in _TOP_TITLES:
+        await message.answer("Usage: /top [streaks|sunflowers|ratings] [page]")
+        return
+    
+    page = int(args[1]) if len(args) > 1 and args[1].isdigit() else 1
+    page = max(page, 1)
+    
+    board = boards[metric]
+    title, score_format = _TOP_TITLES[metric]
+    page_size = settings.LEADERBOARD_PAGE_SIZE
+    offset = (page - 1) * page_size
+    entries = board.top(page_size, offset)
+    
+    if not entries:
+        await message.answer(f"{title}\n\nNo one here yet.")
+        return
+    
+    user_id = message.from_user.id
+    lines = []
+    for i, (entry_user_id, score) in enumerate(entries, start=offset + 1):
+        you = " ← you" if entry_user_id == user_id else ""
+        lines.append(f"{i}. {score_format.format(score)}{you}")
+    
+    pages = (len(board) + page_size - 1) // page_size
+    rank = board.rank(user_id)
+    rank_text = f"Your rank: #{rank} of {len(board)}" if rank else "You're not ranked yet"
+    
+    await message.answer(
+        f"{title} (page {page}/{pages})\n\n"
+        + "\n".join(lines)
+        + f"\n\n{rank_text}"
+    )
+
+
 @router.message(Command("profile"))
 async def cmd_profile(message: Message):
     """Show user profile"""
@@ -0,0 +1,140 @@
+"""
+Inline keyboard rendering - NO SQL, no router
+Keyboards are built once per distinct input and memoized in a bounded LRU.
+Cached markups are SHARED between every caller that gets them: they are
+only ever passed as reply_markup (aiogram just serializes them) and must
+never be mutated - InlineKeyboardMarkup is a mutable model.
+Tic-tac-toe boards are cached as game-independent layouts keyed by the
+board alone (at most a few thousand reachable positions, in their own
+LRU); the game_id is filled in when the markup is rendered.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from config import settings
+
+
+class KeyboardCache:
+    """LRU of rendered markups (or layouts) keyed by the inputs they were built from"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._markups: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        markup = self._markups.get(key)
+        if markup is not None:
+            self.hits += 1
+            self._markups.move_to_end(key)
+            return markup
+
+        self.misses += 1
+        markup = self._markups[key] = build()
+        if len(self._markups) > self.maxsize:
+            self._markups.popitem(last=False)
+        return markup
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._markups),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+_cache = KeyboardCache(settings.KEYBOARD_CACHE_SIZE)
+_tictactoe_layouts = KeyboardCache(settings.KEYBOARD_CACHE_SIZE)
+
+
+def get_keyboard_cache_stats() -> Dict[str, float]:
+    """Hit rate and size of the rendered keyboard caches (markups + board layouts)"""
+    size = hits = misses = 0
+    for cache in (_cache, _tictactoe_layouts):
+        stats = cache.stats()
+        size += stats['size']
+        hits += stats['hits']
+        misses += stats['misses']
+    return {
+        'size': size,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+    }
+
+
+def _build_tictactoe_layout(board: Tuple[str, ...]) -> Tuple[Tuple[Tuple[str, int], ...], ...]:
+    """(text, position) rows for a board, independent of the game"""
+    return tuple(
+        tuple((board[i] or str(i + 1), i) for i in range(row, row + 3))
+        for row in range(0, 9, 3)
+    )
+
+
+def tictactoe_keyboard(game_id: int, board) -> InlineKeyboardMarkup:
+    """Board buttons for one game position (layout cached per board, game_id filled in)"""
+    board = tuple(board)
+    layout = _tictactoe_layouts.get(board, lambda: _build_tictactoe_layout(board))
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=text, callback_data=f"ttt:{game_id}:{i}") for text, i in row]
+        for row in layout
+    ])
+
+
+def _build_game_menu() -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="🎯 Tic Tac Toe", callback_data="game_menu:tictactoe")
+    builder.button(text="📝 Word Chain (Easy)", callback_data="game_menu:wordchain_easy")
+    builder.button(text="📝 Word Chain (Hard)", callback_data="game_menu:wordchain_hard")
+    builder.button(text="🔤 Hangman", callback_data="game_menu:hangman")
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+def game_menu_keyboard() -> InlineKeyboardMarkup:
+    return _cache.get(('game_menu',), _build_game_menu)
+
+
+def _build_bet_menu(game_type: str) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="No bet", callback_data=f"game_bet:{game_type}:0")
+    builder.button(text="50 🌻", callback_data=f"game_bet:{game_type}:50")
+    builder.button(text="100 🌻", callback_data=f"game_bet:{game_type}:100")
+    builder.button(text="200 🌻", callback_data=f"game_bet:{game_type}:200")
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+def bet_menu_keyboard(game_type: str) -> InlineKeyboardMarkup:
+    return _cache.get(('bet', game_type), lambda: _build_bet_menu(game_type))
+
+
+def _build_rating(rated_user_id: int) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    for i in range(1, 6):
+        builder.button(text=f"{i} ⭐", callback_data=f"rate:{rated_user_id}:{i}")
+    builder.adjust(5)
+    return builder.as_markup()
+
+
+def rating_keyboard(rated_user_id: int) -> InlineKeyboardMarkup:
+    return _cache.get(('rate', rated_user_id), lambda: _build_rating(rated_user_id))
+
+
+def _build_chat_controls() -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="Next Partner", callback_data="next")
+    builder.button(text="Stop Chat", callback_data="stop")
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+def chat_controls_keyboard() -> InlineKeyboardMarkup:
+    """Next / Stop buttons sent with every match"""
+    return _cache.get(('chat_controls',), _build_chat_controls)
@@ -14,6 +14,7 @@ from db.matchmaking import join_waiting_pool, leave_waiting_pool, end_chat_atomi
 from db.ratings import get_average_rating
 from db.streaks import update_streak
 from services.matcher import find_best_match, create_match
+from handlers.keyboards import chat_controls_keyboard
 
 router = Router()
 
@@ -83,17 +84,9 @@ async def start_matchmaking(bot: Bot, user_id: int, gender_pref: str = None):
     # Get user data
     gender = await get_gender(user_id)
     user_is_premium = await is_premium(user_id)
-    rating_info = await get_average_rating(user_id)
-    
-    # Add to waiting pool
-    await join_waiting_pool(
-        user_id,
-        gender,
-        user_is_premium,
-        rating_info[0] if rating_info else None,
-        rating_info[1] if rating_info else 0,
-        gender_pref
-    )
+    
+    # Add to waiting pool (rating comes from precomputed rating_scores)
+    await join_waiting_pool(user_id, gender, user_is_premium, gender_pref)
     
     # Try to find match
     partner_id = await find_best_match(user_id, gender_pref)
@@ -121,13 +114,9 @@ async def notify_match(bot: Bot, user_a: int, user_b: int):
     msg_b = "✅ Partner found — "
     msg_b += f"⭐ {rating_a[0]} rated by {rating_a[1]} users" if rating_a else "New user (no ratings yet)"
     
-    builder = InlineKeyboardBuilder()
-    builder.button(text="Next Partner", callback_data="next")
-    builder.button(text="Stop Chat", callback_data="stop")
-    builder.adjust(2)
-    
-    await bot.send_message(user_a, msg_a, reply_markup=builder.as_markup())
-    await bot.send_message(user_b, msg_b, reply_markup=builder.as_markup())
+    controls = chat_controls_keyboard()
+    await bot.send_message(user_a, msg_a, reply_markup=controls)
+    await bot.send_message(user_b, msg_b, reply_markup=controls)
 
 
 @router.message(Command("next"))
@@ -3,26 +3,19 @@ Rating handler - NO SQL, uses db modules
 """
 from aiogram import Router, F, Bot
 from aiogram.types import CallbackQuery
-from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from db.ratings import add_rating, get_pending_ratings
-from db.sunflowers import add_sunflowers
-from db.users import transition_state, UserState
+from db.ratings import submit_rating
+from handlers.keyboards import rating_keyboard
 
 router = Router()
 
 
 async def show_rating_prompt(bot: Bot, rater_id: int, rated_user_id: int):
     """Show rating prompt"""
-    builder = InlineKeyboardBuilder()
-    for i in range(1, 6):
-        builder.button(text=f"{i} ⭐", callback_data=f"rate:{rated_user_id}:{i}")
-    builder.adjust(5)
-    
     await bot.send_message(
         rater_id,
         "Please rate your last partner:",
-        reply_markup=builder.as_markup()
+        reply_markup=rating_keyboard(rated_user_id)
     )
 
 
@@ -34,20 +27,10 @@ async def handle_rating(callback: CallbackQuery):
     rating = int(parts[2])
     user_id = callback.from_user.id
     
-    # Save rating (removes from pending automatically)
-    await add_rating(rated_user_id, user_id, rating)
-    
-    # Award sunflowers
-    if rating >= 4:
-        await add_sunflowers(user_id, 10, 'rating')
-        await add_sunflowers(rated_user_id, 20, 'rating')
+    # Rating, rewards and RATING → IDLE (when done) in one transaction
+    if await submit_rating(rated_user_id, user_id, rating) is None:
+        await callback.answer("This rating was already submitted or has expired.", show_alert=True)
+        return
     
     await callback.message.edit_text("✅ Thanks for your rating!")
-    
-    # Check if done rating
-    pending = await get_pending_ratings(user_id)
-    if not pending:
-        # All ratings done, transition RATING → IDLE
-        await transition_state(user_id, UserState.RATING, UserState.IDLE)
-    
     await callback.answer()
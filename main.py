@@ -10,7 +10,7 @@ from typing import Callable, Dict, Any, Awaitable
 from datetime import datetime
 
 from config import settings
-from db.connection import init_database
+from db.connection import init_database, close_database
 from db.moderation import is_banned
 
 # Setup logging
@@ -69,10 +69,95 @@ async def main():
     await init_database()
     print("BOOT: database ready")
 
+    # Background jobs
+    from datetime import time as dtime
+    from services.scheduler import start_periodic, start_daily, stop_all
+    from services.archiver import archive_expired_partitions
+    from services.link_filter import link_counter
+    from services.content_filter import content_filter
+    from services.dictionary import word_dictionary
+    from services.hangman_words import hangman_words
+    from services.auto_ban import violation_tracker
+    from services.rating_scores import run_rating_score_job
+    from services.rating_sweeper import sweep_expired_pending_ratings
+    from services.ledger_compaction import run_ledger_checkpoint_job
+    from services.streak_job import run_streak_job
+    from db.leaderboards import load_leaderboards, save_leaderboard_snapshot
+    from db.games import load_active_games, flush_game_sessions
+    from db.users import load_premium_cache
+    from db.moderation import migrate_legacy_messages
+
+    moved = await migrate_legacy_messages()
+    if moved:
+        logger.info(f"Moved {moved} legacy monitored messages into daily partitions")
+    await load_leaderboards()
+    logger.info(f"Premium users cached: {await load_premium_cache()}")
+    logger.info(f"Recovered {await load_active_games()} unfinished games")
+    await link_counter.load()
+    await violation_tracker.load()
+    await content_filter.reload_if_changed()
+    await word_dictionary.load()
+    await hangman_words.load()
+
+    start_periodic(
+        "monitor-archiver",
+        settings.MONITOR_ARCHIVE_INTERVAL_SECONDS,
+        archive_expired_partitions,
+    )
+    start_periodic(
+        "link-counter-flush",
+        settings.LINK_COUNTER_FLUSH_SECONDS,
+        link_counter.flush,
+    )
+    start_periodic(
+        "banned-phrases-reload",
+        settings.BANNED_PHRASES_RELOAD_SECONDS,
+        content_filter.reload_if_changed,
+    )
+    start_periodic(
+        "violation-flush",
+        settings.VIOLATION_FLUSH_SECONDS,
+        violation_tracker.flush,
+    )
+    start_periodic(
+        "rating-scores",
+        settings.RATING_SCORE_INTERVAL_SECONDS,
+        run_rating_score_job,
+    )
+    start_periodic(
+        "pending-rating-sweeper",
+        settings.PENDING_RATING_SWEEP_SECONDS,
+        sweep_expired_pending_ratings,
+    )
+    start_periodic(
+        "ledger-checkpoint",
+        settings.LEDGER_CHECKPOINT_INTERVAL_SECONDS,
+        run_ledger_checkpoint_job,
+    )
+    start_periodic(
+        "game-session-flush",
+        settings.GAME_SESSION_FLUSH_SECONDS,
+        flush_game_sessions,
+    )
+    start_daily(
+        "streak-evaluation",
+        dtime.fromisoformat(settings.STREAK_JOB_TIME),
+        run_streak_job,
+        run_at_start=True,
+    )
+
     # Init bot
     bot = Bot(token=settings.BOT_TOKEN)
     dp = Dispatcher(storage=MemoryStorage())
 
+    from services.game_reaper import reap_abandoned_games
+
+    start_periodic(
+        "game-reaper",
+        settings.GAME_REAPER_TICK_SECONDS,
+        lambda: reap_abandoned_games(bot),
+    )
+
     # Middleware
     dp.message.middleware(BanCheckMiddleware())
     dp.callback_query.middleware(BanCheckMiddleware())
@@ -84,6 +169,7 @@ async def main():
     from handlers.how import router as how_router
     from handlers.admin import router as admin_router
     from handlers.games import router as games_router
+    from handlers.chat import router as chat_router
 
     dp.include_router(start_router)
     dp.include_router(matchmaking_router)
@@ -91,6 +177,7 @@ async def main():
     dp.include_router(how_router)
     dp.include_router(admin_router)
     dp.include_router(games_router)
+    dp.include_router(chat_router)  # catch-all relay, keep last
 
     logger.info("All handlers registered")
 
@@ -99,7 +186,15 @@ async def main():
 
     print("BOT IS ALIVE")
 
-    await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+    try:
+        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+    finally:
+        await stop_all()
+        await flush_game_sessions()
+        await link_counter.flush()
+        await violation_tracker.flush()
+        await save_leaderboard_snapshot()
+        await close_database()
 
 
 if __name__ == "__main__":
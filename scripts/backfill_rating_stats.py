@@ -0,0 +1,26 @@
+"""
+One-off: rebuild rating_stats from the ratings table.
+
+Usage: python scripts/backfill_rating_stats.py
+Safe to re-run; the rebuild (and dropping the ratings leaderboard
+snapshot, so /top is rebuilt on next start) happens in a single transaction.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.connection import init_database, close_database  # noqa: E402
+from db.ratings import rebuild_rating_stats  # noqa: E402
+
+
+async def main():
+    await init_database()
+    users = await rebuild_rating_stats()
+    await close_database()
+    print(f"rating_stats rebuilt for {users} users")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark: banned-phrase filter cost per message.
+
+Usage: python scripts/bench_content_filter.py [pattern_count] [message_count]
+"""
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.content_filter import PhraseAutomaton  # noqa: E402
+
+
+def _word(rng: random.Random) -> str:
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+
+def main():
+    pattern_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    message_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+
+    rng = random.Random(42)
+    phrases = [' '.join(_word(rng) for _ in range(rng.randint(1, 3))) for _ in range(pattern_count)]
+    messages = [' '.join(_word(rng) for _ in range(rng.randint(5, 25))) for _ in range(message_count)]
+
+    # Plant a hit in 1% of messages
+    for i in range(0, message_count, 100):
+        messages[i] += ' ' + rng.choice(phrases)
+
+    start = time.perf_counter()
+    automaton = PhraseAutomaton(phrases)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    hits = sum(1 for text in messages if automaton.find(text))
+    elapsed = time.perf_counter() - start
+
+    avg_len = sum(map(len, messages)) / message_count
+
+    print(f"patterns:        {automaton.phrase_count}")
+    print(f"automaton nodes: {len(automaton.goto)}")
+    print(f"build time:      {build_ms:.1f} ms")
+    print(f"messages:        {message_count} (avg {avg_len:.0f} chars, {hits} with hits)")
+    print(f"per message:     {elapsed / message_count * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
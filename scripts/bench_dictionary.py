@@ -0,0 +1,106 @@
+"""
+Benchmark: Word Chain dictionary build/load time, memory and lookup cost.
+
+Usage: python scripts/bench_dictionary.py [word_count] [wordlist]
+Without a wordlist, word_count random words (with frequencies) are generated
+into a temporary file. Exits non-zero if a lookup disagrees with the list.
+"""
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.dictionary import build_index, WordIndex, TIERS  # noqa: E402
+
+
+def _rss_kb() -> int:
+    """Resident set size (Linux); 0 where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return 0
+
+
+def _generate(path: str, count: int, rng: random.Random):
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12))))
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for word in words:
+            f.write(f"{word}\t{rng.paretovariate(1.2):.3f}\n")
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tmp, 'words.txt')
+        if len(sys.argv) <= 2:
+            _generate(wordlist, count, rng)
+        index_path = os.path.join(tmp, 'words.idx')
+
+        start = time.perf_counter()
+        words = build_index(wordlist, index_path)
+        build_s = time.perf_counter() - start
+
+        rss_before = _rss_kb()
+        tracemalloc.start()
+        start = time.perf_counter()
+        index = WordIndex(index_path)
+        open_ms = (time.perf_counter() - start) * 1000
+        heap_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+        with open(wordlist, encoding='utf-8') as f:
+            listed = [line.split()[0] for line in f]
+        sample = listed[:50_000]
+        # A generated miss may be a real word further down the list
+        vocabulary = set(listed)
+        misses = [w + 'zq' for w in sample[:10_000]]
+
+        start = time.perf_counter()
+        found = sum(1 for w in sample if index.find(w) >= 0)
+        find_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+        wrong = sum(1 for w in misses if index.find(w) >= 0 and w not in vocabulary)
+
+        start = time.perf_counter()
+        for _ in range(50_000):
+            index.random_word(rng.choice(string.ascii_lowercase), rng.randrange(TIERS))
+        suggest_us = (time.perf_counter() - start) / 50_000 * 1e6
+
+        # Touch every page so RSS shows the full mapped size
+        sum(index.tiers)
+        rss_after = _rss_kb()
+
+        tier_counts = [0] * TIERS
+        for tier in index.tiers:
+            tier_counts[tier] += 1
+
+        print(f"words:          {words}")
+        print(f"index file:     {os.path.getsize(index_path) / 1024:.0f} KB")
+        print(f"build:          {build_s:.2f} s (one-off, when the wordlist changes)")
+        print(f"open (mmap):    {open_ms:.2f} ms, {heap_kb:.1f} KB Python heap")
+        print(f"RSS growth:     {(rss_after - rss_before) / 1024:.1f} MB (file-backed pages)")
+        print(f"membership:     {find_us:.2f} us ({found}/{len(sample)} found)")
+        print(f"suggest:        {suggest_us:.2f} us")
+        print(f"tiers:          easy {tier_counts[0]}, medium {tier_counts[1]}, hard {tier_counts[2]}")
+
+        index.close()
+
+    ok = found == len(sample) and not wrong
+    print("lookups: OK" if ok else "lookups: MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
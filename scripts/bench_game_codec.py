@@ -0,0 +1,100 @@
+"""
+Round-trip check and size/speed benchmark: binary game_state codec vs JSON.
+
+Usage: python scripts/bench_game_codec.py [states_per_type]
+Exits non-zero if any state fails to round-trip.
+"""
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.game_codec import encode_state, decode_state  # noqa: E402
+from services.game_engine import (  # noqa: E402
+    create_tictactoe_state, make_tictactoe_move, create_wordchain_state,
+    create_hangman_state, make_hangman_guess
+)
+
+
+def _tictactoe(rng: random.Random) -> dict:
+    state = create_tictactoe_state()
+    for _ in range(rng.randint(0, 9)):
+        free = [i for i, cell in enumerate(state['board']) if not cell]
+        success, winner = make_tictactoe_move(state, rng.choice(free), state['current_symbol'])
+        if winner:
+            break
+    return state
+
+
+def _hangman(rng: random.Random) -> dict:
+    state = create_hangman_state()
+    for letter in rng.sample(string.ascii_lowercase, rng.randint(0, 10)):
+        if make_hangman_guess(state, letter)[1]:
+            break
+    return state
+
+
+def _wordchain(rng: random.Random) -> dict:
+    state = create_wordchain_state(rng.choice(('easy', 'hard')))
+    for _ in range(rng.randint(0, 40)):
+        last = state['words'][-1][-1]
+        word = last + ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+        if word not in state['used_words']:
+            state['words'].append(word)
+            state['used_words'].add(word)
+    return state
+
+
+def _json(state: dict) -> str:
+    # The old storage format; sets need converting to be serializable at all
+    return json.dumps(state, default=sorted)
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = random.Random(42)
+    failures = 0
+
+    for game_type, make in (('tictactoe', _tictactoe), ('hangman', _hangman), ('wordchain_easy', _wordchain)):
+        states = [make(rng) for _ in range(count)]
+
+        for state in states:
+            if decode_state(encode_state(game_type, state)) != state:
+                failures += 1
+
+        start = time.perf_counter()
+        encoded = [encode_state(game_type, state) for state in states]
+        encode_us = (time.perf_counter() - start) / count * 1e6
+
+        start = time.perf_counter()
+        for data in encoded:
+            decode_state(data)
+        decode_us = (time.perf_counter() - start) / count * 1e6
+
+        start = time.perf_counter()
+        texts = [_json(state) for state in states]
+        json_encode_us = (time.perf_counter() - start) / count * 1e6
+
+        start = time.perf_counter()
+        for text in texts:
+            json.loads(text)
+        json_decode_us = (time.perf_counter() - start) / count * 1e6
+
+        binary_size = sum(map(len, encoded)) / count
+        json_size = sum(len(text.encode('utf-8')) for text in texts) / count
+
+        print(f"{game_type}")
+        print(f"  size:   {binary_size:6.1f} B binary vs {json_size:6.1f} B json ({json_size / binary_size:.1f}x)")
+        print(f"  encode: {encode_us:6.2f} us binary vs {json_encode_us:6.2f} us json")
+        print(f"  decode: {decode_us:6.2f} us binary vs {json_decode_us:6.2f} us json")
+
+    print("round-trip: OK" if not failures else f"round-trip: {failures} FAILURES")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark: one-transaction submit_rating vs the old five-step star tap
+(rating + pending delete, two reward commits, pending read, state change).
+
+Usage: python scripts/bench_submit_rating.py [taps]
+Runs against a throwaway database file. Exits non-zero if a replayed tap
+is accepted or pays a second reward.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+
+
+async def _seed(first_rater: int, taps: int):
+    """taps raters in RATING, each owing one rating to rater + 1_000_000"""
+    from db.connection import transaction
+
+    async with transaction() as db:
+        await db.executemany(
+            "INSERT INTO users (user_id, current_state) VALUES (?, 'RATING')",
+            [(rater,) for rater in range(first_rater, first_rater + taps)]
+        )
+        await db.executemany(
+            "INSERT INTO pending_ratings (rater_id, rated_user_id) VALUES (?, ?)",
+            [(rater, rater + 1_000_000) for rater in range(first_rater, first_rater + taps)]
+        )
+
+
+async def _five_step_tap(rated_user_id: int, rater_user_id: int, rating: int):
+    """The pre-submit_rating handler: five round-trips, up to four commits"""
+    from db.connection import transaction
+    from db.ratings import get_pending_ratings
+    from db.sunflowers import add_sunflowers
+    from db.users import transition_state, UserState
+
+    async with transaction() as db:
+        await db.execute(
+            "INSERT OR REPLACE INTO ratings (rated_user_id, rater_user_id, rating) VALUES (?, ?, ?)",
+            (rated_user_id, rater_user_id, rating)
+        )
+        await db.execute(
+            "DELETE FROM pending_ratings WHERE rater_id = ? AND rated_user_id = ?",
+            (rater_user_id, rated_user_id)
+        )
+
+    if rating >= 4:
+        await add_sunflowers(rater_user_id, settings.RATING_REWARD_RATER, 'rating')
+        await add_sunflowers(rated_user_id, settings.RATING_REWARD_RATED, 'rating')
+
+    if not await get_pending_ratings(rater_user_id):
+        await transition_state(rater_user_id, UserState.RATING, UserState.IDLE)
+
+
+async def main() -> int:
+    taps = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    from db.connection import init_database, close_database
+    from db.ratings import submit_rating
+    from db.sunflowers import get_sunflower_balance
+
+    await init_database()
+
+    await _seed(1, taps)
+    start = time.perf_counter()
+    for rater in range(1, 1 + taps):
+        await _five_step_tap(rater + 1_000_000, rater, 5)
+    five_step_ms = (time.perf_counter() - start) / taps * 1000
+
+    first = 1 + taps
+    await _seed(first, taps)
+    start = time.perf_counter()
+    for rater in range(first, first + taps):
+        await submit_rating(rater + 1_000_000, rater, 5)
+    submit_ms = (time.perf_counter() - start) / taps * 1000
+
+    # Replaying an already-submitted tap must be rejected and pay nothing
+    before = await get_sunflower_balance(first)
+    replay = await submit_rating(first + 1_000_000, first, 5)
+    after = await get_sunflower_balance(first)
+
+    await close_database()
+
+    print(f"taps:             {taps} (5 stars, sequential, file-backed db)")
+    print(f"five-step tap:    {five_step_ms:.2f} ms")
+    print(f"submit_rating:    {submit_ms:.2f} ms ({five_step_ms / submit_ms:.1f}x faster)")
+    print(f"replayed tap:     {'rejected' if replay is None else 'ACCEPTED'}, "
+          f"rater balance {before['total']} -> {after['total']}")
+
+    ok = replay is None and before == after
+    print("OK" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATABASE_PATH = os.path.join(tmp, "bench.db")
+        code = asyncio.run(main())
+    sys.exit(code)
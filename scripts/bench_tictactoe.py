@@ -0,0 +1,85 @@
+"""
+Micro-benchmark: tic-tac-toe per-move cost, bitboard engine vs the old
+list-scanning engine, plus a consistency check against it.
+
+Usage: python scripts/bench_tictactoe.py [games]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+start = time.perf_counter()
+from services.game_engine import (  # noqa: E402
+    create_tictactoe_state, make_tictactoe_move, tictactoe_outcome,
+    OUTCOME_ONGOING, OUTCOME_STATUS
+)
+import_ms = (time.perf_counter() - start) * 1000
+
+_LINES = [
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],
+    [0, 4, 8], [2, 4, 6]
+]
+
+
+def _legacy_move(state: dict, position: int, symbol: str):
+    """The previous implementation, kept here as the baseline"""
+    if state['board'][position]:
+        return (False, None)
+    state['board'][position] = symbol
+    for combo in _LINES:
+        board = state['board']
+        if board[combo[0]] and board[combo[0]] == board[combo[1]] == board[combo[2]]:
+            return (True, board[combo[0]])
+    if '' not in state['board']:
+        return (True, 'draw')
+    state['current_symbol'] = 'O' if symbol == 'X' else 'X'
+    return (True, None)
+
+
+def _play(move, new_state, games):
+    results = []
+    moves = 0
+    start = time.perf_counter()
+    for order in games:
+        state = new_state()
+        for position in order:
+            moves += 1
+            success, winner = move(state, position, state['current_symbol'])
+            if winner:
+                results.append(winner)
+                break
+    elapsed = time.perf_counter() - start
+    return results, moves, elapsed
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(42)
+    games = [rng.sample(range(9), 9) for _ in range(count)]
+
+    legacy, moves, legacy_s = _play(_legacy_move, lambda: {'board': [''] * 9, 'current_symbol': 'X'}, games)
+    bitboard, _, bitboard_s = _play(make_tictactoe_move, create_tictactoe_state, games)
+
+    state = create_tictactoe_state()
+    start = time.perf_counter()
+    for _ in range(count):
+        tictactoe_outcome(state)
+    outcome_us = (time.perf_counter() - start) / count * 1e6
+
+    print(f"outcome table:   {sum(1 for s in OUTCOME_STATUS if s)} valid positions, built in {import_ms:.1f} ms (import)")
+    print(f"games / moves:   {count} / {moves}")
+    print(f"legacy engine:   {legacy_s / moves * 1e6:.2f} us/move")
+    print(f"bitboard engine: {bitboard_s / moves * 1e6:.2f} us/move")
+    print(f"outcome lookup:  {outcome_us:.2f} us (best opening move: {tictactoe_outcome(state)[1] + 1})")
+
+    ok = legacy == bitboard and tictactoe_outcome(state)[0] == OUTCOME_ONGOING
+    print("results match legacy engine: OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Reconcile sunflower_balances against the sunflower_ledger audit trail.
+
+Usage: python scripts/reconcile_sunflowers.py [--fix]
+Reports every (user, source) whose materialized balance differs from the
+ledger sum. With --fix, rebuilds sunflower_balances from the ledger and
+drops the sunflowers leaderboard snapshot, so /top is rebuilt on next start.
+(The first-deploy backfill runs automatically in init_database.)
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.connection import init_database, close_database  # noqa: E402
+from db.sunflowers import (  # noqa: E402
+    SOURCES, get_ledger_balances, get_materialized_balances, rebuild_sunflower_balances
+)
+
+
+async def main():
+    fix = "--fix" in sys.argv[1:]
+
+    await init_database()
+
+    ledger = await get_ledger_balances()
+    materialized = await get_materialized_balances()
+
+    zero = dict.fromkeys(SOURCES, 0)
+    drifted_users = 0
+
+    for user_id in sorted(ledger.keys() | materialized.keys()):
+        expected = ledger.get(user_id, zero)
+        actual = materialized.get(user_id, zero)
+        diffs = [
+            f"{source}: balance={actual[source]} ledger={expected[source]}"
+            for source in SOURCES
+            if actual[source] != expected[source]
+        ]
+        if diffs:
+            drifted_users += 1
+            print(f"user {user_id}: " + ", ".join(diffs))
+
+    print(f"{len(ledger)} users in ledger, {drifted_users} with drift")
+
+    if fix and drifted_users:
+        users = await rebuild_sunflower_balances()
+        print(f"sunflower_balances rebuilt for {users} users")
+
+    await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Concurrency stress test: parallel smart deductions must never overdraw.
+
+Usage: python scripts/stress_deduct_sunflowers.py [parallel] [amount]
+Runs against a throwaway database file; exits non-zero on any overdraft or
+ledger/balance mismatch.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+
+USER_ID = 1
+SEED = {'game': 300, 'gift': 200, 'rating': 250, 'streak': 250}
+
+
+async def main() -> int:
+    parallel = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    amount = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    from db.connection import get_db, init_database, close_database
+    from db.sunflowers import credit_many, deduct_sunflowers_smart, get_sunflower_balance
+
+    await init_database()
+
+    await credit_many([(USER_ID, seed, source) for source, seed in SEED.items()])
+
+    start_total = sum(SEED.values())
+    results = await asyncio.gather(
+        *(deduct_sunflowers_smart(USER_ID, amount) for _ in range(parallel))
+    )
+
+    succeeded = [r for r in results if r is not None]
+    balance = await get_sunflower_balance(USER_ID)
+
+    async with await get_db() as db:
+        cursor = await db.execute(
+            "SELECT COALESCE(SUM(amount), 0) FROM sunflower_ledger WHERE user_id = ?",
+            (USER_ID,)
+        )
+        ledger_total = (await cursor.fetchone())[0]
+        cursor = await db.execute(
+            "SELECT MIN(streak), MIN(game), MIN(gift), MIN(rating) FROM sunflower_balances"
+        )
+        min_column = min(await cursor.fetchone())
+
+    await close_database()
+
+    expected_successes = min(parallel, start_total // amount)
+    deducted = sum(sum(r.values()) for r in succeeded)
+
+    print(f"parallel deductions: {parallel} x {amount} from {start_total}")
+    print(f"succeeded:           {len(succeeded)} (expected {expected_successes})")
+    print(f"deducted:            {deducted}")
+    print(f"final balance:       {balance['total']} (ledger {ledger_total})")
+
+    ok = (
+        len(succeeded) == expected_successes
+        and deducted == len(succeeded) * amount
+        and balance['total'] == ledger_total == start_total - deducted
+        and min_column >= 0
+    )
+    print("OK: no overdraft" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATABASE_PATH = os.path.join(tmp, "stress.db")
+        code = asyncio.run(main())
+    sys.exit(code)
@@ -0,0 +1,35 @@
+"""
+Verify sunflower ledger checkpoints against the archived entries.
+
+Usage: python scripts/verify_ledger_checkpoints.py
+Exits non-zero if any checkpoint + tail differs from the full history.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.connection import init_database, close_database  # noqa: E402
+from db.sunflowers import verify_checkpoints  # noqa: E402
+
+
+async def main() -> int:
+    await init_database()
+
+    mismatches = await verify_checkpoints()
+    await close_database()
+
+    for user_id, source, checkpoint, archived in mismatches:
+        print(f"user {user_id} {source}: checkpoint={checkpoint} archived={archived}")
+
+    if mismatches:
+        print(f"{len(mismatches)} checkpoint(s) do not match history")
+        return 1
+
+    print("OK: checkpoint + tail equals full history for every user and source")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
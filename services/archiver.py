@@ -0,0 +1,140 @@
+"""
+Monitored message archiver - NO SQL, uses db.moderation
+Expired daily partitions are streamed into gzip JSONL files, each with a
+sidecar index (sender_id -> line numbers) so admin lookups can skip files.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+
+from config import settings
+from db.moderation import (
+    list_message_partitions, iter_partition_messages, drop_message_partition
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _archive_paths(day: date) -> tuple[Path, Path]:
+    """(data file, index file) for a day"""
+    base = Path(settings.MONITOR_ARCHIVE_DIR) / f"monitored_messages_{day.strftime('%Y%m%d')}"
+    return base.with_suffix(".jsonl.gz"), base.with_suffix(".idx.json")
+
+
+def _write_lines(fh, rows: List[dict]):
+    """Blocking write of a chunk of rows as JSON lines"""
+    for row in rows:
+        fh.write(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+        fh.write(b"\n")
+
+
+async def archive_partition(day: date) -> int:
+    """
+    Stream one partition into its archive file and write the index.
+    Returns number of rows archived.
+    """
+    data_path, index_path = _archive_paths(day)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_data = data_path.with_name(data_path.name + ".tmp")
+
+    index = {
+        'day': day.isoformat(),
+        'rows': 0,
+        'first_sent_at': None,
+        'last_sent_at': None,
+        'senders': {}
+    }
+
+    fh = await asyncio.to_thread(gzip.open, tmp_data, "wb")
+    try:
+        async for rows in iter_partition_messages(day, settings.MONITOR_ARCHIVE_CHUNK_SIZE):
+            for row in rows:
+                line_no = index['rows']
+                index['senders'].setdefault(str(row['sender_id']), []).append(line_no)
+                index['first_sent_at'] = index['first_sent_at'] or row['sent_at']
+                index['last_sent_at'] = row['sent_at']
+                index['rows'] += 1
+
+            await asyncio.to_thread(_write_lines, fh, rows)
+    finally:
+        await asyncio.to_thread(fh.close)
+
+    # Data first, index second: an index never points at a missing file
+    os.replace(tmp_data, data_path)
+
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_index, index_path)
+
+    return index['rows']
+
+
+async def archive_expired_partitions() -> int:
+    """
+    Archive and drop every partition older than MONITOR_RETENTION_DAYS.
+    Returns total rows archived.
+    """
+    cutoff = date.today() - timedelta(days=settings.MONITOR_RETENTION_DAYS)
+    total = 0
+
+    for day in await list_message_partitions():
+        if day >= cutoff:
+            continue
+
+        rows = await archive_partition(day)
+        await drop_message_partition(day)
+        total += rows
+
+        logger.info(f"Archived monitored messages for {day}: {rows} rows")
+
+    return total
+
+
+def _search_archive_sync(sender_id: int, limit: int) -> List[dict]:
+    """Blocking archive search, newest file first"""
+    archive_dir = Path(settings.MONITOR_ARCHIVE_DIR)
+    if not archive_dir.exists():
+        return []
+
+    key = str(sender_id)
+    results = []
+
+    for index_path in sorted(archive_dir.glob("monitored_messages_*.idx.json"), reverse=True):
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+        wanted = index['senders'].get(key)
+        if not wanted:
+            continue
+
+        data_path = index_path.with_name(index_path.name.replace(".idx.json", ".jsonl.gz"))
+        wanted_set = set(wanted)
+        last_wanted = wanted[-1]
+        matches = []
+
+        with gzip.open(data_path, "rb") as fh:
+            for line_no, line in enumerate(fh):
+                if line_no in wanted_set:
+                    matches.append(json.loads(line))
+                if line_no >= last_wanted:
+                    break
+
+        matches.reverse()
+        results.extend(matches[:limit - len(results)])
+
+        if len(results) >= limit:
+            break
+
+    return results
+
+
+async def search_archive(sender_id: int, limit: int = 50) -> List[dict]:
+    """Search archived messages by sender, newest first"""
+    return await asyncio.to_thread(_search_archive_sync, sender_id, limit)
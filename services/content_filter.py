@@ -0,0 +1,141 @@
+"""
+Banned-phrase filter - NO SQL, pure matching logic
+All configured phrases are compiled into one Aho-Corasick automaton, so a
+message is checked against every phrase in a single pass over its text.
+The phrase file is watched and the automaton is rebuilt off the event loop
+when it changes; readers always see either the old or the new automaton.
+"""
+import asyncio
+import logging
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton over lower-cased phrases.
+    Node 0 is the root; out[node] lists lengths of phrases ending there
+    (already merged along the failure chain).
+    """
+
+    __slots__ = ('goto', 'fail', 'out', 'phrase_count')
+
+    def __init__(self, phrases: Iterable[str]):
+        self.goto: List[dict] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[int, ...]] = [()]
+        self.phrase_count = 0
+
+        own: List[List[int]] = [[]]
+
+        for phrase in phrases:
+            phrase = phrase.strip().lower()
+            if not phrase:
+                continue
+
+            node = 0
+            for ch in phrase:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    own.append([])
+                node = nxt
+
+            if len(phrase) not in own[node]:
+                own[node].append(len(phrase))
+                self.phrase_count += 1
+
+        # BFS to set failure links and merge outputs
+        self.out = [()] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for child in queue:
+            self.out[child] = tuple(own[child])
+
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+
+            for ch, child in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0)
+                self.out[child] = tuple(own[child]) + self.out[self.fail[child]]
+                queue.append(child)
+
+    def find(self, text: str, whole_words: bool = True) -> List[str]:
+        """Return banned phrases found in text (in order of occurrence)"""
+        text = text.lower()
+        goto, fail, out = self.goto, self.fail, self.out
+        hits = []
+        node = 0
+        n = len(text)
+
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            if out[node]:
+                end = i + 1
+                for length in out[node]:
+                    start = end - length
+                    if whole_words and (
+                        (start > 0 and text[start - 1].isalnum())
+                        or (end < n and text[end].isalnum())
+                    ):
+                        continue
+                    hits.append(text[start:end])
+
+        return hits
+
+
+def _read_phrases(path: str) -> List[str]:
+    """One phrase per line; blank lines and '#' comments ignored"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line for line in f.read().splitlines() if line.strip() and not line.startswith("#")]
+
+
+class ContentFilter:
+    """Holds the current automaton and hot-reloads it from BANNED_PHRASES_PATH"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.automaton = PhraseAutomaton(())
+        self._mtime: Optional[float] = None
+
+    def check(self, text: str) -> List[str]:
+        """Banned phrases in text (empty list if clean)"""
+        if not text or not self.automaton.phrase_count:
+            return []
+        return self.automaton.find(text)
+
+    async def reload_if_changed(self) -> bool:
+        """Rebuild the automaton if the phrase file changed. Returns True on reload."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return False
+
+        if mtime == self._mtime:
+            return False
+
+        phrases = await asyncio.to_thread(_read_phrases, self.path)
+        automaton = await asyncio.to_thread(PhraseAutomaton, phrases)
+
+        self.automaton = automaton
+        self._mtime = mtime
+
+        logger.info(f"Content filter loaded {automaton.phrase_count} phrases")
+        return True
+
+
+content_filter = ContentFilter(settings.BANNED_PHRASES_PATH)
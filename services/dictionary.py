@@ -0,0 +1,260 @@
+"""
+Word Chain dictionary - NO SQL, pure lookup logic
+The wordlist (WORDLIST_PATH, one word per line, optionally "word<TAB>frequency")
+is compiled once into a sorted binary index next to it (<path>.idx) and
+memory-mapped, so the words never become Python objects:
+- membership: binary search inside the first letter's range, O(log n)
+- suggest:    random pick from a (tier, first letter) range, O(1)
+The index is rebuilt whenever the wordlist is newer than it.
+"""
+import asyncio
+import logging
+import mmap
+import os
+import random
+import struct
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TIER_EASY, TIER_MEDIUM, TIER_HARD = range(3)
+TIERS = 3
+LETTERS = 26
+
+_MAGIC = b'WDX1'
+_HEADER = struct.Struct('<4sII')  # magic, word count, blob length
+
+
+def word_tier(word: str, frequency_rank: Optional[float]) -> int:
+    """
+    Difficulty tier. frequency_rank is 0.0 (most common) .. 1.0, or None
+    when the wordlist has no frequencies (length alone decides).
+    """
+    length = len(word)
+
+    if frequency_rank is None:
+        if length <= 5:
+            return TIER_EASY
+        return TIER_MEDIUM if length <= 8 else TIER_HARD
+
+    if length <= 6 and frequency_rank < 0.2:
+        return TIER_EASY
+    if length >= 8 or frequency_rank > 0.6:
+        return TIER_HARD
+    return TIER_MEDIUM
+
+
+def _read_wordlist(path: str) -> Tuple[List[str], Dict[str, float]]:
+    """Lower-case a-z words (2+ letters), deduplicated; frequencies if given"""
+    frequencies: Dict[str, float] = {}
+    words = set()
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+
+            word = parts[0].lower()
+            if len(word) < 2 or not (word.isascii() and word.isalpha()):
+                continue
+
+            words.add(word)
+            if len(parts) > 1:
+                try:
+                    frequencies[word] = max(frequencies.get(word, 0.0), float(parts[1]))
+                except ValueError:
+                    pass
+
+    return sorted(words), frequencies
+
+
+def build_index(wordlist_path: str, index_path: str) -> int:
+    """
+    Compile the wordlist into the binary index. Returns word count.
+    Layout (little-endian uint32 unless noted):
+      header | letter_start[27] | offsets[n+1] | tier_start[79] | tier_words[n] | tiers[n] (uint8) | blob
+    """
+    words, frequencies = _read_wordlist(wordlist_path)
+    count = len(words)
+
+    ranks: Dict[str, float] = {}
+    if frequencies:
+        by_frequency = sorted(words, key=lambda w: -frequencies.get(w, 0.0))
+        ranks = {word: i / count for i, word in enumerate(by_frequency)}
+
+    letter_start = array('I', [0] * (LETTERS + 1))
+    offsets = array('I', [0])
+    tiers = bytearray(count)
+    buckets: List[List[int]] = [[] for _ in range(TIERS * LETTERS)]
+    blob = bytearray()
+
+    for i, word in enumerate(words):
+        letter = ord(word[0]) - 97
+        letter_start[letter + 1] = i + 1
+
+        blob += word.encode('ascii')
+        offsets.append(len(blob))
+
+        tier = word_tier(word, ranks.get(word) if ranks else None)
+        tiers[i] = tier
+        buckets[tier * LETTERS + letter].append(i)
+
+    # Letters with no words start where the previous letter ended
+    for letter in range(1, LETTERS + 1):
+        letter_start[letter] = max(letter_start[letter], letter_start[letter - 1])
+
+    tier_start = array('I', [0])
+    tier_words = array('I')
+    for bucket in buckets:
+        tier_words.extend(bucket)
+        tier_start.append(len(tier_words))
+
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, count, len(blob)))
+        f.write(letter_start.tobytes())
+        f.write(offsets.tobytes())
+        f.write(tier_start.tobytes())
+        f.write(tier_words.tobytes())
+        f.write(tiers)
+        f.write(blob)
+    os.replace(tmp_path, index_path)
+
+    return count
+
+
+class WordIndex:
+    """Read-only view over a memory-mapped index file"""
+
+    def __init__(self, index_path: str):
+        with open(index_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, blob_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a word index: {index_path}")
+
+        view = memoryview(self._mm)
+        pos = _HEADER.size
+
+        def take(items: int, fmt: str = 'I'):
+            nonlocal pos
+            size = items * (4 if fmt == 'I' else 1)
+            part = view[pos:pos + size].cast(fmt)
+            pos += size
+            return part
+
+        n = self.count
+        self.letter_start = take(LETTERS + 1)
+        self.offsets = take(n + 1)
+        self.tier_start = take(TIERS * LETTERS + 1)
+        self.tier_words = take(n)
+        self.tiers = take(n, 'B')
+        self._blob = pos
+
+    def word_at(self, i: int) -> bytes:
+        start = self._blob + self.offsets[i]
+        return self._mm[start:self._blob + self.offsets[i + 1]]
+
+    def find(self, word: str) -> int:
+        """Index of word, or -1"""
+        if not word or not ('a' <= word[0] <= 'z'):
+            return -1
+
+        target = word.encode('ascii', 'ignore')
+        letter = ord(word[0]) - 97
+        lo, hi = self.letter_start[letter], self.letter_start[letter + 1]
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo < self.letter_start[letter + 1] and self.word_at(lo) == target:
+            return lo
+        return -1
+
+    def random_word(self, letter: str, tier: Optional[int] = None) -> Optional[str]:
+        """Random word starting with letter (optionally from one tier)"""
+        if not ('a' <= letter <= 'z'):
+            return None
+
+        index = ord(letter) - 97
+
+        if tier is None:
+            lo, hi = self.letter_start[index], self.letter_start[index + 1]
+            if lo == hi:
+                return None
+            return self.word_at(random.randrange(lo, hi)).decode('ascii')
+
+        bucket = tier * LETTERS + index
+        lo, hi = self.tier_start[bucket], self.tier_start[bucket + 1]
+        if lo == hi:
+            return None
+        return self.word_at(self.tier_words[random.randrange(lo, hi)]).decode('ascii')
+
+    def close(self):
+        for name in ('letter_start', 'offsets', 'tier_start', 'tier_words', 'tiers'):
+            getattr(self, name).release()
+        self._mm.close()
+
+
+class WordDictionary:
+    """Current WordIndex, (re)built from WORDLIST_PATH when the list changes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index: Optional[WordIndex] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.index is not None
+
+    def __contains__(self, word: str) -> bool:
+        return self.index is not None and self.index.find(word) >= 0
+
+    def tier(self, word: str) -> Optional[int]:
+        if self.index is None:
+            return None
+        i = self.index.find(word)
+        return self.index.tiers[i] if i >= 0 else None
+
+    def suggest(self, letter: str, tier: Optional[int] = None) -> Optional[str]:
+        """A word starting with letter, from tier if it has one"""
+        if self.index is None:
+            return None
+        return self.index.random_word(letter, tier) or self.index.random_word(letter)
+
+    def _open(self) -> WordIndex:
+        index_path = self.path + '.idx'
+        try:
+            stale = os.stat(index_path).st_mtime < os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            stale = True
+
+        if stale:
+            build_index(self.path, index_path)
+        return WordIndex(index_path)
+
+    async def load(self) -> bool:
+        """(Re)open the index, building it first if needed. False if no wordlist."""
+        if not os.path.exists(self.path):
+            logger.warning(f"Wordlist {self.path} not found; Word Chain accepts any 3+ letter word")
+            return False
+
+        index = await asyncio.to_thread(self._open)
+        old, self.index = self.index, index
+        if old is not None:
+            old.close()
+
+        logger.info(f"Word dictionary loaded {index.count} words")
+        return True
+
+
+word_dictionary = WordDictionary(settings.WORDLIST_PATH)
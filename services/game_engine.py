@@ -2,15 +2,112 @@
 Game engines - NO SQL, pure game logic
 """
 import random
+from array import array
 from typing import Optional, Tuple
 
+from services.dictionary import word_dictionary, TIER_EASY, TIER_HARD
+from services.hangman_words import hangman_words
+
 
 # ============ TIC TAC TOE ============
+# Bitboards: bit i of a 9-bit mask is cell i; X and O each have a mask.
+FULL_BOARD = 0x1FF
+
+WINNING_LINES = (
+    0b000000111, 0b000111000, 0b111000000,  # Rows
+    0b001001001, 0b010010010, 0b100100100,  # Columns
+    0b100010001, 0b001010100                # Diagonals
+)
+
+# WIN_TABLE[mask] == 1 if mask contains a full line
+WIN_TABLE = bytes(
+    1 if any(mask & line == line for line in WINNING_LINES) else 0
+    for mask in range(512)
+)
+
+# Base-3 position index: TERNARY[x] + 2 * TERNARY[o]
+TERNARY = tuple(sum(3 ** i for i in range(9) if mask >> i & 1) for mask in range(512))
+
+# Outcome table over all 3^9 cell assignments, for the side to move
+# (X when counts are equal, O when X has one more; other positions are invalid)
+OUTCOME_INVALID, OUTCOME_ONGOING, OUTCOME_X_WINS, OUTCOME_O_WINS, OUTCOME_DRAW = range(5)
+
+
+def _build_outcome_tables() -> Tuple[bytearray, array, array]:
+    """
+    Status of every position, plus minimax value (+1 X wins, 0 draw,
+    -1 O wins, with perfect play) and best move for the side to move.
+    Positions are solved in order of decreasing piece count.
+    """
+    size = 3 ** 9
+    status = bytearray(size)
+    value = array('b', bytes(size))
+    best = array('b', [-1]) * size
+
+    by_count = [[] for _ in range(10)]
+    for x in range(512):
+        for o in range(512):
+            if x & o:
+                continue
+            x_count, o_count = bin(x).count('1'), bin(o).count('1')
+            if x_count - o_count in (0, 1):
+                by_count[x_count + o_count].append((x, o))
+
+    for pieces in range(9, -1, -1):
+        for x, o in by_count[pieces]:
+            index = TERNARY[x] + 2 * TERNARY[o]
+            x_won, o_won = WIN_TABLE[x], WIN_TABLE[o]
+
+            if x_won and o_won:
+                continue  # unreachable, stays OUTCOME_INVALID
+            if x_won:
+                status[index], value[index] = OUTCOME_X_WINS, 1
+                continue
+            if o_won:
+                status[index], value[index] = OUTCOME_O_WINS, -1
+                continue
+            if x | o == FULL_BOARD:
+                status[index] = OUTCOME_DRAW
+                continue
+
+            status[index] = OUTCOME_ONGOING
+            x_to_move = pieces % 2 == 0
+            best_value, best_move = (-2, -1) if x_to_move else (2, -1)
+            empty = FULL_BOARD & ~(x | o)
+
+            for cell in range(9):
+                bit = 1 << cell
+                if not empty & bit:
+                    continue
+                child = index + (3 ** cell) * (1 if x_to_move else 2)
+                child_value = value[child]
+                if (child_value > best_value) if x_to_move else (child_value < best_value):
+                    best_value, best_move = child_value, cell
+
+            value[index], best[index] = best_value, best_move
+
+    return status, value, best
+
+
+OUTCOME_STATUS, OUTCOME_VALUE, BEST_MOVE = _build_outcome_tables()
+
+
+def _masks(state: dict) -> Tuple[int, int]:
+    """X/O bitboards, derived from the board for states stored without them"""
+    if 'x' not in state:
+        board = state['board']
+        state['x'] = sum(1 << i for i in range(9) if board[i] == 'X')
+        state['o'] = sum(1 << i for i in range(9) if board[i] == 'O')
+    return state['x'], state['o']
+
+
 def create_tictactoe_state() -> dict:
     """Create initial tic tac toe state"""
     return {
         'board': [''] * 9,
-        'current_symbol': 'X'
+        'current_symbol': 'X',
+        'x': 0,
+        'o': 0
     }
 
 
@@ -20,18 +117,25 @@ def make_tictactoe_move(state: dict, position: int, symbol: str) -> Tuple[bool,
     Returns (success, winner).
     winner can be 'X', 'O', 'draw', or None (game continues).
     """
-    if state['board'][position]:
+    x, o = _masks(state)
+    bit = 1 << position
+    
+    if (x | o) & bit:
         return (False, None)
     
     state['board'][position] = symbol
     
-    # Check for winner
-    winner = check_tictactoe_winner(state['board'])
-    if winner:
-        return (True, winner)
+    if symbol == 'X':
+        x = state['x'] = x | bit
+        if WIN_TABLE[x]:
+            return (True, 'X')
+    else:
+        o = state['o'] = o | bit
+        if WIN_TABLE[o]:
+            return (True, 'O')
     
     # Check for draw
-    if '' not in state['board']:
+    if x | o == FULL_BOARD:
         return (True, 'draw')
     
     # Switch symbol
@@ -42,19 +146,30 @@ def make_tictactoe_move(state: dict, position: int, symbol: str) -> Tuple[bool,
 
 def check_tictactoe_winner(board: list) -> Optional[str]:
     """Check for tic tac toe winner"""
-    winning_combinations = [
-        [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Rows
-        [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columns
-        [0, 4, 8], [2, 4, 6]              # Diagonals
-    ]
-    
-    for combo in winning_combinations:
-        if board[combo[0]] and board[combo[0]] == board[combo[1]] == board[combo[2]]:
-            return board[combo[0]]
+    x = o = 0
+    for i, cell in enumerate(board):
+        if cell == 'X':
+            x |= 1 << i
+        elif cell == 'O':
+            o |= 1 << i
     
+    if WIN_TABLE[x]:
+        return 'X'
+    if WIN_TABLE[o]:
+        return 'O'
     return None
 
 
+def tictactoe_outcome(state: dict) -> Tuple[int, int]:
+    """
+    Table lookup for the current position.
+    Returns (OUTCOME_* status, best move for the side to move or -1).
+    """
+    x, o = _masks(state)
+    index = TERNARY[x] + 2 * TERNARY[o]
+    return OUTCOME_STATUS[index], BEST_MOVE[index]
+
+
 # ============ WORD CHAIN ============
 EASY_WORDS = [
     "cat", "dog", "sun", "moon", "tree", "book", "love", "home", "star", "bird",
@@ -69,8 +184,12 @@ HARD_WORDS = [
 
 def create_wordchain_state(difficulty: str) -> dict:
     """Create initial word chain state"""
-    words = EASY_WORDS if difficulty == 'easy' else HARD_WORDS
-    initial_word = random.choice(words)
+    tier = TIER_EASY if difficulty == 'easy' else TIER_HARD
+    initial_word = word_dictionary.suggest(random.choice('abcdefghijklmnoprstw'), tier)
+    
+    if not initial_word:
+        # No wordlist configured
+        initial_word = random.choice(EASY_WORDS if difficulty == 'easy' else HARD_WORDS)
     
     return {
         'words': [initial_word],
@@ -95,10 +214,13 @@ def make_wordchain_move(state: dict, word: str) -> Tuple[bool, Optional[str], st
     if word in state['used_words']:
         return (False, "Word already used", last_word[-1])
     
-    # Check if valid word (basic check - 3+ letters)
+    # Check if valid word (3+ letters, and in the dictionary when one is loaded)
     if len(word) < 3:
         return (False, "Word too short (min 3 letters)", last_word[-1])
     
+    if word_dictionary.loaded and word not in word_dictionary:
+        return (False, "Not a word in the dictionary", last_word[-1])
+    
     # Add word
     state['words'].append(word)
     state['used_words'].add(word)
@@ -113,13 +235,32 @@ HANGMAN_WORDS = [
 ]
 
 
-def create_hangman_state() -> dict:
-    """Create initial hangman state"""
-    word = random.choice(HANGMAN_WORDS)
+# Guessed letters are a 26-bit mask: bit 0 = 'a' ... bit 25 = 'z'
+def letter_mask(letters) -> int:
+    mask = 0
+    for letter in letters:
+        if 'a' <= letter <= 'z':
+            mask |= 1 << (ord(letter) - 97)
+    return mask
+
+
+def _hangman_masks(state: dict) -> Tuple[int, int]:
+    """(guessed, word) masks, derived for states stored as letter lists"""
+    if 'guessed' not in state:
+        state['guessed'] = letter_mask(state.pop('guessed_letters', ()))
+    if 'word_mask' not in state:
+        state['word_mask'] = letter_mask(state['word'])
+    return state['guessed'], state['word_mask']
+
+
+def create_hangman_state(chat_id: Optional[int] = None, difficulty: str = 'medium') -> dict:
+    """Create initial hangman state (word bank pick, avoiding the chat's recent words)"""
+    word = hangman_words.pick(difficulty, chat_id) or random.choice(HANGMAN_WORDS)
     
     return {
         'word': word,
-        'guessed_letters': [],
+        'guessed': 0,
+        'word_mask': letter_mask(word),
         'wrong_guesses': 0,
         'max_wrong': 6
     }
@@ -134,26 +275,30 @@ def make_hangman_guess(state: dict, letter: str) -> Tuple[bool, bool, Optional[s
     letter = letter.lower().strip()
     
     # Validate single letter
-    if len(letter) != 1 or not letter.isalpha():
+    if len(letter) != 1 or not ('a' <= letter <= 'z'):
         return (False, False, None)
     
+    guessed, word_mask = _hangman_masks(state)
+    bit = 1 << (ord(letter) - 97)
+    
     # Check if already guessed
-    if letter in state['guessed_letters']:
+    if guessed & bit:
         return (False, False, None)
     
     # Add to guessed
-    state['guessed_letters'].append(letter)
+    guessed = state['guessed'] = guessed | bit
     
     # Check if letter in word
-    if letter not in state['word']:
+    if not word_mask & bit:
         state['wrong_guesses'] += 1
         
         # Check if lost
         if state['wrong_guesses'] >= state['max_wrong']:
             return (True, True, 'lost')
+        return (True, False, None)
     
     # Check if won
-    if all(letter in state['guessed_letters'] for letter in state['word']):
+    if word_mask & ~guessed == 0:
         return (True, True, 'won')
     
     return (True, False, None)
@@ -161,8 +306,9 @@ def make_hangman_guess(state: dict, letter: str) -> Tuple[bool, bool, Optional[s
 
 def format_hangman_word(state: dict) -> str:
     """Format word with guessed letters"""
+    guessed, _ = _hangman_masks(state)
     return ' '.join([
-        letter if letter in state['guessed_letters'] else '_'
+        letter if guessed >> (ord(letter) - 97) & 1 else '_'
         for letter in state['word']
     ])
 
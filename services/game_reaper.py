@@ -0,0 +1,46 @@
+"""
+Abandoned-game reaper - NO SQL, uses db.games
+Forfeits games whose player to move let GAME_TURN_TIMEOUT_SECONDS pass:
+the other player wins and the bet is settled. Timed-out games come from the
+session store's timer wheel and are settled GAME_REAPER_BATCH per transaction.
+"""
+import asyncio
+import logging
+
+from config import settings
+from db.games import pop_timed_out_games, forfeit_games
+
+logger = logging.getLogger(__name__)
+
+
+async def _notify_forfeit(bot, game: dict):
+    idle_id = game['current_turn']
+    winner_id = game['player2_id'] if idle_id == game['player1_id'] else game['player1_id']
+    bet = game['bet_amount']
+    pot = bet * 2 + settings.GAME_BASE_REWARD
+    loss = f" -{bet} 🌻" if bet else ""
+
+    await asyncio.gather(
+        bot.send_message(winner_id, f"⏰ Your partner ran out of time. You win! +{pot} 🌻"),
+        bot.send_message(idle_id, f"⏰ You ran out of time and forfeited the game.{loss}"),
+        return_exceptions=True
+    )
+
+
+async def reap_abandoned_games(bot):
+    """Forfeit timed-out games in batches and tell both players"""
+    games = pop_timed_out_games()
+    if not games:
+        return
+
+    settled = []
+    batch_size = settings.GAME_REAPER_BATCH
+    for i in range(0, len(games), batch_size):
+        batch = games[i:i + batch_size]
+        settled += await forfeit_games([
+            (game, game['player2_id'] if game['current_turn'] == game['player1_id'] else game['player1_id'])
+            for game in batch
+        ])
+
+    await asyncio.gather(*(_notify_forfeit(bot, game) for game in settled))
+    logger.info(f"Reaper forfeited {len(settled)} abandoned games")
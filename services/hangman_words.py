@@ -0,0 +1,217 @@
+"""
+Hangman word bank - NO SQL, pure selection logic
+The word file (HANGMAN_WORDS_PATH, one word per line) is compiled into a
+binary index (<path>.idx) of word offsets grouped by (length bucket,
+letter-entropy bucket) and memory-mapped once by load() at startup (built
+off the event loop), so picking a word does no I/O and never loads the
+list into Python objects. Each chat remembers its last
+HANGMAN_RECENT_WORDS picks to avoid repeats (the least recently active
+chats are forgotten beyond MAX_TRACKED_CHATS).
+"""
+import asyncio
+import logging
+import math
+import mmap
+import os
+import random
+import struct
+from array import array
+from collections import Counter, OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+LENGTH_BUCKETS = 3   # <= 5, 6-8, >= 9 letters
+ENTROPY_BUCKETS = 3  # < 0.8, < 0.95, >= 0.95 of the length's maximum (log2 len)
+BUCKETS = LENGTH_BUCKETS * ENTROPY_BUCKETS
+
+# Short words with repeated letters (low entropy for their length) are the
+# hardest to guess; long words of mostly distinct letters the easiest
+DIFFICULTY_BUCKETS: Dict[str, Tuple[int, ...]] = {
+    'easy': (1 * ENTROPY_BUCKETS + 2, 2 * ENTROPY_BUCKETS + 1, 2 * ENTROPY_BUCKETS + 2),
+    'medium': (0 * ENTROPY_BUCKETS + 2, 1 * ENTROPY_BUCKETS + 0, 1 * ENTROPY_BUCKETS + 1, 2 * ENTROPY_BUCKETS + 0),
+    'hard': (0 * ENTROPY_BUCKETS + 0, 0 * ENTROPY_BUCKETS + 1),
+}
+
+MAX_TRACKED_CHATS = 10_000
+
+_MAGIC = b'HWX1'
+_HEADER = struct.Struct('<4sII')  # magic, word count, blob length
+
+
+def letter_entropy(word: str) -> float:
+    """Shannon entropy (bits) of the word's letter distribution"""
+    length = len(word)
+    return -sum(c / length * math.log2(c / length) for c in Counter(word).values())
+
+
+def word_bucket(word: str) -> int:
+    length = len(word)
+    length_bucket = 0 if length <= 5 else 1 if length <= 8 else 2
+
+    # Relative to log2(length), the entropy of all-distinct letters, so every
+    # length can reach every bucket (a 5-letter word tops out at 2.32 bits):
+    # "tree" 0.75 / "apple" 0.83 / "crane" 1.0
+    entropy = letter_entropy(word) / math.log2(length)
+    entropy_bucket = 0 if entropy < 0.8 else 1 if entropy < 0.95 else 2
+
+    return length_bucket * ENTROPY_BUCKETS + entropy_bucket
+
+
+def build_index(words_path: str, index_path: str) -> int:
+    """
+    Compile the word file. Returns word count.
+    Layout: header | bucket_start[BUCKETS + 1] | offsets[n + 1] | blob
+    (words are stored grouped by bucket, so a bucket is a contiguous range)
+    """
+    buckets: List[List[str]] = [[] for _ in range(BUCKETS)]
+    seen = set()
+
+    with open(words_path, "r", encoding="utf-8") as f:
+        for line in f:
+            word = line.strip().lower()
+            if len(word) < 4 or not (word.isascii() and word.isalpha()) or word in seen:
+                continue
+            seen.add(word)
+            buckets[word_bucket(word)].append(word)
+
+    bucket_start = array('I', [0])
+    offsets = array('I', [0])
+    blob = bytearray()
+
+    for bucket in buckets:
+        for word in bucket:
+            blob += word.encode('ascii')
+            offsets.append(len(blob))
+        bucket_start.append(len(offsets) - 1)
+
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, len(offsets) - 1, len(blob)))
+        f.write(bucket_start.tobytes())
+        f.write(offsets.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, index_path)
+
+    return len(offsets) - 1
+
+
+def _map_index(words_path: str) -> Tuple[mmap.mmap, memoryview, memoryview, int, int]:
+    """
+    Blocking: (re)build the index if the word file is newer, then map it.
+    Returns (mmap, bucket_start, offsets, blob position, word count).
+    """
+    index_path = words_path + '.idx'
+    try:
+        stale = os.stat(index_path).st_mtime < os.stat(words_path).st_mtime
+    except FileNotFoundError:
+        stale = True
+
+    if stale:
+        build_index(words_path, index_path)
+
+    with open(index_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, count, _ = _HEADER.unpack_from(mm, 0)
+    if magic != _MAGIC:
+        mm.close()
+        raise ValueError(f"Not a hangman word index: {index_path}")
+
+    view = memoryview(mm)
+    pos = _HEADER.size
+    bucket_start = view[pos:pos + (BUCKETS + 1) * 4].cast('I')
+    pos += (BUCKETS + 1) * 4
+    offsets = view[pos:pos + (count + 1) * 4].cast('I')
+
+    return mm, bucket_start, offsets, pos + (count + 1) * 4, count
+
+
+class HangmanWordBank:
+    """Memory-mapped word index (opened by load()) with per-chat recent-word exclusion"""
+
+    def __init__(self, path: str, recent: int):
+        self.path = path
+        self.recent_size = recent
+        self._mm: Optional[mmap.mmap] = None
+        self._recent: "OrderedDict[int, Deque[int]]" = OrderedDict()
+        self.count = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._mm is not None
+
+    async def load(self) -> bool:
+        """(Re)open the index, building it first if needed. False if no word file."""
+        if not os.path.exists(self.path):
+            logger.warning(f"Hangman word file {self.path} not found; using the built-in list")
+            return False
+
+        mapped = await asyncio.to_thread(_map_index, self.path)
+        self.close()
+        self._mm, self._bucket_start, self._offsets, self._blob, self.count = mapped
+        # Recent picks are index positions, meaningless in a rebuilt index
+        self._recent.clear()
+
+        logger.info(f"Hangman word bank mapped: {self.count} words")
+        return True
+
+    def _word_at(self, i: int) -> str:
+        return self._mm[self._blob + self._offsets[i]:self._blob + self._offsets[i + 1]].decode('ascii')
+
+    def _random_index(self, difficulty: str) -> Optional[int]:
+        """Uniform over the difficulty's buckets, O(number of buckets)"""
+        ranges = [
+            (self._bucket_start[b], self._bucket_start[b + 1])
+            for b in DIFFICULTY_BUCKETS.get(difficulty, DIFFICULTY_BUCKETS['medium'])
+        ]
+        total = sum(hi - lo for lo, hi in ranges)
+        if not total:
+            # Nothing in this difficulty: any word will do
+            return random.randrange(self.count) if self.count else None
+
+        pick = random.randrange(total)
+        for lo, hi in ranges:
+            if pick < hi - lo:
+                return lo + pick
+            pick -= hi - lo
+
+    def pick(self, difficulty: str = 'medium', chat_id: Optional[int] = None) -> Optional[str]:
+        """Random word for difficulty, avoiding the chat's recent words. None if not loaded."""
+        if self._mm is None:
+            return None
+
+        recent = self._recent.get(chat_id) if chat_id is not None else None
+
+        index = None
+        for _ in range(8):
+            index = self._random_index(difficulty)
+            if index is None or not recent or index not in recent:
+                break
+
+        if index is None:
+            return None
+
+        if chat_id is not None:
+            if recent is None:
+                recent = self._recent[chat_id] = deque(maxlen=self.recent_size)
+                if len(self._recent) > MAX_TRACKED_CHATS:
+                    self._recent.popitem(last=False)
+            else:
+                self._recent.move_to_end(chat_id)
+            recent.append(index)
+
+        return self._word_at(index)
+
+    def close(self):
+        if self._mm is None:
+            return
+        self._bucket_start.release()
+        self._offsets.release()
+        self._mm.close()
+        self._mm = None
+
+
+hangman_words = HangmanWordBank(settings.HANGMAN_WORDS_PATH, settings.HANGMAN_RECENT_WORDS)
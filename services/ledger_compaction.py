@@ -0,0 +1,25 @@
+"""
+Sunflower ledger compaction job - NO SQL, uses db.sunflowers
+"""
+import logging
+import time
+
+from config import settings
+from db.sunflowers import checkpoint_ledger
+
+logger = logging.getLogger(__name__)
+
+
+async def run_ledger_checkpoint_job():
+    """Checkpoint and archive ledger entries older than the horizon"""
+    start = time.perf_counter()
+    users, archived = await checkpoint_ledger(
+        settings.LEDGER_CHECKPOINT_HORIZON_DAYS,
+        settings.LEDGER_CHECKPOINT_BATCH_USERS
+    )
+
+    if archived:
+        logger.info(
+            f"Ledger checkpoint: {archived} entries from {users} users archived "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
@@ -0,0 +1,169 @@
+"""
+Link/spam detection for relayed messages - NO SQL, uses db.moderation
+Patterns are compiled once at import. Per-user daily counters live in memory
+and are written back to link_tracking periodically, so the accept/reject
+decision never waits on the database.
+Spam (flooding, repeating the same message) is detected from per-user state
+held only in memory, for the most recently active SPAM_TRACKED_USERS users.
+"""
+import re
+import time
+from collections import OrderedDict, deque
+from datetime import date
+from typing import Deque, Dict, Optional, Set, Tuple
+
+from config import settings
+from db.moderation import get_link_counts, set_link_counts
+
+
+# One alternation so each link is matched (and counted) once:
+# URLs, bare domains, t.me invites and @usernames
+LINK_PATTERN = re.compile(
+    r"(?:https?://|www\.)\S+"
+    r"|\b(?:t|telegram)\.me/\S+"
+    r"|\b[a-z0-9][a-z0-9-]*\.(?:com|net|org|io|me|ru|xyz|info|co|app|link|site|online)\b(?:/\S*)?"
+    r"|(?<![\w@.])@[a-z][a-z0-9_]{4,31}\b",
+    re.IGNORECASE
+)
+
+
+def count_links(text: str) -> int:
+    """Count URLs and Telegram handles in text"""
+    if not text:
+        return 0
+
+    return len(LINK_PATTERN.findall(text))
+
+
+class DailyLinkCounter:
+    """
+    In-memory per-user link counts for the current day.
+    Counts roll over at the date boundary; the previous day's dirty entries
+    are kept until the next flush so nothing is lost at midnight.
+    """
+
+    def __init__(self):
+        self.day: date = date.today()
+        self.counts: Dict[int, int] = {}
+        self.dirty: Set[int] = set()
+        self._closed_day: Dict[int, int] = {}
+        self._closed_date: date = self.day
+
+    def _rotate(self, today: date):
+        """Start a new day, parking unflushed counts from the old one"""
+        self._closed_day = {user_id: self.counts[user_id] for user_id in self.dirty}
+        self._closed_date = self.day
+        self.day = today
+        self.counts = {}
+        self.dirty = set()
+
+    def try_consume(self, user_id: int, links: int, limit: int) -> bool:
+        """
+        Reserve `links` from the user's daily allowance.
+        Returns False (and consumes nothing) if it would exceed limit.
+        """
+        today = date.today()
+        if today != self.day:
+            self._rotate(today)
+
+        used = self.counts.get(user_id, 0)
+        if used + links > limit:
+            return False
+
+        self.counts[user_id] = used + links
+        self.dirty.add(user_id)
+        return True
+
+    def used_today(self, user_id: int) -> int:
+        """Links used today (0 after the day rolls over)"""
+        if date.today() != self.day:
+            return 0
+        return self.counts.get(user_id, 0)
+
+    async def load(self):
+        """Warm today's counts from link_tracking (startup)"""
+        self.day = date.today()
+        self.counts = await get_link_counts(self.day)
+        self.dirty = set()
+
+    async def flush(self):
+        """Write dirty counts back to link_tracking"""
+        if self._closed_day:
+            closed, closed_date = self._closed_day, self._closed_date
+            self._closed_day = {}
+            await set_link_counts(closed_date, closed)
+
+        if self.dirty:
+            day = self.day
+            pending = {user_id: self.counts[user_id] for user_id in self.dirty}
+            self.dirty = set()
+            await set_link_counts(day, pending)
+
+
+link_counter = DailyLinkCounter()
+
+
+def daily_link_limit(user_is_premium: bool) -> int:
+    """Links per day allowed for this user"""
+    return settings.PREMIUM_DAILY_LINK_LIMIT if user_is_premium else settings.FREE_DAILY_LINK_LIMIT
+
+
+def allow_links(user_id: int, links: int, user_is_premium: bool) -> bool:
+    """
+    Decide whether a message carrying `links` links may be relayed (no I/O).
+    Consumes from the user's daily allowance when allowed.
+    """
+    if links == 0:
+        return True
+
+    return link_counter.try_consume(user_id, links, daily_link_limit(user_is_premium))
+
+
+class SpamDetector:
+    """
+    Per-user flood and repeat detection (no I/O).
+    A message is spam if it is the SPAM_FLOOD_MESSAGES+1th within
+    SPAM_FLOOD_SECONDS, or the SPAM_REPEAT_LIMIT+1th identical one in a row.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        # user_id -> (recent message times, last text hash, times repeated, in a spam run)
+        self._users: "OrderedDict[int, Tuple[Deque[float], Optional[int], int, bool]]" = OrderedDict()
+
+    def check(self, user_id: int, text: Optional[str]) -> Tuple[Optional[str], bool]:
+        """
+        Record a message. Returns (reason, first): reason is 'flood' / 'repeat'
+        if it is spam, else None; first is True only for the first spam
+        message of a run, so one burst counts as one violation.
+        """
+        now = time.monotonic()
+
+        entry = self._users.get(user_id)
+        if entry is None:
+            times, last_hash, repeats, in_run = deque(), None, 0, False
+            if len(self._users) >= self.max_users:
+                self._users.popitem(last=False)
+        else:
+            times, last_hash, repeats, in_run = entry
+            self._users.move_to_end(user_id)
+
+        cutoff = now - settings.SPAM_FLOOD_SECONDS
+        while times and times[0] <= cutoff:
+            times.popleft()
+        times.append(now)
+
+        text_hash = hash(text) if text else None
+        repeats = repeats + 1 if text_hash is not None and text_hash == last_hash else 1
+
+        reason = None
+        if len(times) > settings.SPAM_FLOOD_MESSAGES:
+            reason = 'flood'
+        elif repeats > settings.SPAM_REPEAT_LIMIT:
+            reason = 'repeat'
+
+        self._users[user_id] = (times, text_hash, repeats, reason is not None)
+        return reason, reason is not None and not in_run
+
+
+spam_detector = SpamDetector(settings.SPAM_TRACKED_USERS)
@@ -18,6 +18,9 @@ def calculate_match_score(candidate: dict, my_is_premium: bool, waiting_seconds:
     - +20 if I'm premium AND candidate rating >= 4.5
     - +10 if candidate rating >= 4.0
     - +1 per 10 seconds waiting time
+    
+    candidate['rating'] is the Bayesian-smoothed score from rating_scores,
+    so a handful of 5-star votes no longer outranks a long track record.
     """
     score = 100
     
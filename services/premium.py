@@ -78,8 +78,8 @@ async def buy_temp_premium(user_id: int) -> bool:
         return False
     
     # Deduct sunflowers
-    success = await deduct_sunflowers_smart(user_id, settings.TEMP_PREMIUM_COST)
-    if not success:
+    breakdown = await deduct_sunflowers_smart(user_id, settings.TEMP_PREMIUM_COST)
+    if breakdown is None:
         return False
     
     # Activate temp premium
@@ -0,0 +1,28 @@
+"""
+Rating score batch job - NO SQL, uses db.ratings
+Periodically recomputes Bayesian-smoothed ratings used by the matcher.
+"""
+import logging
+import time
+
+from config import settings
+from db.ratings import recompute_rating_scores
+from db.leaderboards import rebuild_ratings_board
+
+logger = logging.getLogger(__name__)
+
+
+async def run_rating_score_job():
+    """Recompute rating_scores and report runtime and throughput"""
+    start = time.perf_counter()
+    rows, users = await recompute_rating_scores(settings.RATING_PRIOR_WEIGHT)
+    elapsed = time.perf_counter() - start
+    
+    # Re-score the ratings leaderboard against the new global mean
+    await rebuild_ratings_board()
+
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    logger.info(
+        f"Rating scores recomputed: {users} users from {rows} ratings "
+        f"in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+    )
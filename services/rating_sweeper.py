@@ -0,0 +1,20 @@
+"""
+Pending-rating expiry sweeper - NO SQL, uses db.ratings
+"""
+import logging
+
+from config import settings
+from db.ratings import expire_pending_ratings
+
+logger = logging.getLogger(__name__)
+
+
+async def sweep_expired_pending_ratings():
+    """Expire old pending ratings and release users stuck in RATING"""
+    deleted, released = await expire_pending_ratings(
+        settings.PENDING_RATING_TTL_HOURS,
+        settings.PENDING_RATING_SWEEP_BATCH
+    )
+
+    if deleted:
+        logger.info(f"Expired {deleted} pending ratings, released {released} users to IDLE")
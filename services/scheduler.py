@@ -0,0 +1,76 @@
+"""
+Background job runner - NO SQL, runs periodic maintenance coroutines
+"""
+import asyncio
+import logging
+from datetime import datetime, time, timedelta
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+_tasks: List[asyncio.Task] = []
+
+
+async def _run_once(name: str, job: Callable[[], Awaitable]):
+    """Run job, logging (not raising) failures"""
+    try:
+        await job()
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception(f"Background job '{name}' failed")
+
+
+async def run_periodic(name: str, interval_seconds: float, job: Callable[[], Awaitable]):
+    """
+    Run job every interval_seconds until cancelled.
+    A failing run is logged and retried on the next tick.
+    """
+    while True:
+        await _run_once(name, job)
+        await asyncio.sleep(interval_seconds)
+
+
+def start_periodic(name: str, interval_seconds: float, job: Callable[[], Awaitable]) -> asyncio.Task:
+    """Schedule a periodic job on the running loop"""
+    task = asyncio.create_task(run_periodic(name, interval_seconds, job), name=name)
+    _tasks.append(task)
+    return task
+
+
+def _seconds_until(at: time) -> float:
+    """Seconds from now until the next local wall-clock `at`"""
+    now = datetime.now()
+    target = datetime.combine(now.date(), at)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+async def run_daily(name: str, at: time, job: Callable[[], Awaitable], run_at_start: bool = False):
+    """
+    Run job once a day at local time `at` until cancelled.
+    run_at_start also runs it immediately (catch up after a restart).
+    """
+    if run_at_start:
+        await _run_once(name, job)
+
+    while True:
+        await asyncio.sleep(_seconds_until(at))
+        await _run_once(name, job)
+
+
+def start_daily(name: str, at: time, job: Callable[[], Awaitable], run_at_start: bool = False) -> asyncio.Task:
+    """Schedule a daily job on the running loop"""
+    task = asyncio.create_task(run_daily(name, at, job, run_at_start), name=name)
+    _tasks.append(task)
+    return task
+
+
+async def stop_all():
+    """Cancel all scheduled jobs and wait for them to exit"""
+    for task in _tasks:
+        task.cancel()
+
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
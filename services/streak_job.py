@@ -0,0 +1,21 @@
+"""
+Nightly streak evaluation job - NO SQL, uses db.streaks
+"""
+import logging
+import time
+
+from config import settings
+from db.streaks import evaluate_broken_streaks
+
+logger = logging.getLogger(__name__)
+
+
+async def run_streak_job():
+    """Settle every streak broken yesterday (pets, resets, clawbacks, gardens)"""
+    start = time.perf_counter()
+    saved, reset = await evaluate_broken_streaks(batch_size=settings.STREAK_JOB_BATCH)
+
+    logger.info(
+        f"Streak job: {saved} saved by pets, {reset} reset "
+        f"in {time.perf_counter() - start:.2f}s"
+    )